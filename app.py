@@ -4,9 +4,13 @@ Flask Web GUI for R27 Infinite AI Leads Agent
 """
 
 from flask import Flask, render_template, request, jsonify, send_file
+from flask.json.provider import JSONProvider, DefaultJSONProvider
 from flask_cors import CORS
 import os
+import csv
+import functools
 import json
+import secrets
 import threading
 import time
 from datetime import datetime, timedelta
@@ -15,19 +19,55 @@ from dotenv import load_dotenv
 import logging
 import pickle
 from collections import deque
+from itertools import chain, compress
 from flask import Response
 import queue
+import io
 import tempfile
-import zipfile
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
 
 # Load environment variables FIRST
 load_dotenv()
 
+# API keys read once at import; use set_instantly_api_key() to change the Instantly key at runtime
+GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', '')
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+INSTANTLY_API_KEY = os.getenv('INSTANTLY_API_KEY', '')
+MAILTESTER_API_KEY = os.getenv('MAILTESTER_API_KEY', '')
+
+def set_instantly_api_key(api_key):
+    """Update the Instantly key for this process (environment and cached constant)"""
+    global INSTANTLY_API_KEY
+    os.environ['INSTANTLY_API_KEY'] = api_key
+    INSTANTLY_API_KEY = api_key
+
+def masked(key):
+    """First 10 characters of a secret for display, or 'None' if unset"""
+    return key[:10] + '...' if key else 'None'
+
 # Import our modules
 from src.providers import get_provider
 # Lead scoring functionality removed
-from src.email_generator import EmailGenerator
+from src.email_generator import get_email_generator
 # from src.drive_uploader import DriveUploader  # Removed - using local downloads instead
 from src.data_normalizer import DataNormalizer
 from src.industry_configs import IndustryConfig
@@ -40,9 +80,42 @@ from src.search_history import SearchHistoryManager
 from src.providers.openstreetmap_provider import OpenStreetMapProvider
 from src.providers.yellowpages_api_provider import YellowPagesAPIProvider
 from src.lead_enrichment import LeadEnricher
-from src.instantly_integration import InstantlyIntegration, CampaignTemplates, convert_r27_leads_to_instantly, create_campaign_from_r27_leads
+from src.utils import tail_lines, write_parquet_sidecar, safe_query_filename, verified_email_mask, stream_zip
+from src.instantly_integration import InstantlyIntegration, CampaignTemplates, convert_r27_leads_to_instantly, create_campaign_from_r27_leads, converted_leads_for
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (falls back to Flask's encoder for unknown types)"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj,
+            default=DefaultJSONProvider.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def dumps_json(obj) -> str:
+    """Serialize obj to a JSON string, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+# Browser/CDN cache lifetime for endpoints whose payload never changes while the app runs
+STATIC_CACHE_SECONDS = 3600
+
+def static_json_response(body):
+    """Response for a pre-serialized, static JSON payload"""
+    return Response(body, mimetype='application/json',
+                    headers={'Cache-Control': f'public, max-age={STATIC_CACHE_SECONDS}'})
+
 
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 app.config['TEMPLATES_AUTO_RELOAD'] = True
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 CORS(app)
@@ -173,6 +246,39 @@ logger = logging.getLogger(__name__)
 jobs = {}
 apollo_jobs = {}
 
+# Bounded worker pool for background jobs (lead generation, Apollo processing)
+JOB_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv('JOB_WORKERS', '8')), thread_name_prefix='job')
+
+# Shared pool for fanning out provider health probes
+PROBE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='probe')
+PROBE_TIMEOUT = 5
+
+# Health-probe results are reused for this long so polling dashboards don't hit upstream APIs
+PROBE_CACHE_TTL = 60
+_probe_cache = {}
+_probe_cache_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def cached_provider(kind):
+    """Provider instance shared by the health/status endpoints"""
+    return get_provider(kind)
+
+
+def cached_probe(provider, query="coffee shop Austin", limit=1):
+    """Run provider.fetch_places(query, limit), reusing a result younger than PROBE_CACHE_TTL"""
+    key = (id(provider), query, limit)
+    now = time.monotonic()
+    with _probe_cache_lock:
+        hit = _probe_cache.get(key)
+    if hit and now - hit[0] < PROBE_CACHE_TTL:
+        return hit[1]
+    
+    results = provider.fetch_places(query, limit)
+    with _probe_cache_lock:
+        _probe_cache[key] = (now, results)
+    return results
+
 # Job persistence
 COMPLETED_JOBS_FILE = 'data/completed_jobs.json'
 
@@ -196,6 +302,7 @@ def save_completed_job(job):
         'total_leads': job.total_leads,
         'emails_verified': job.emails_verified,
         'valid_emails': job.valid_emails,
+        'verified_count': job.verified_count,
         'result_file': job.result_file,
         'share_link': job.share_link,
         'error': job.error,
@@ -225,17 +332,38 @@ def save_completed_job(job):
     except Exception as e:
         logger.error(f"Failed to save completed job: {e}")
 
+# Parsed completed-jobs file, reused until the file's mtime/size changes
+_completed_jobs_cache = {'signature': None, 'jobs': {}}
+
 def load_completed_jobs():
     """Load completed jobs from persistent storage"""
-    if not os.path.exists(COMPLETED_JOBS_FILE):
+    try:
+        st = os.stat(COMPLETED_JOBS_FILE)
+    except FileNotFoundError:
         return {}
     
+    signature = (st.st_mtime_ns, st.st_size)
+    if _completed_jobs_cache['signature'] != signature:
+        try:
+            with open(COMPLETED_JOBS_FILE, 'r') as f:
+                loaded = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load completed jobs: {e}")
+            return {}
+        _completed_jobs_cache['jobs'] = loaded
+        _completed_jobs_cache['signature'] = signature
+    
+    # Shallow copy so callers (e.g. save_completed_job) can add/drop entries freely
+    return dict(_completed_jobs_cache['jobs'])
+
+def stat_or_none(path):
+    """os.stat(path), or None if path is empty or the file doesn't exist"""
+    if not path:
+        return None
     try:
-        with open(COMPLETED_JOBS_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Failed to load completed jobs: {e}")
-        return {}
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
 
 def get_job_info(job_id):
     """Get job info from memory or persistent storage"""
@@ -250,6 +378,28 @@ def get_job_info(job_id):
     
     return None
 
+# Shared Instantly client so jobs reuse one pooled HTTP session
+_instantly_client = None
+_instantly_lock = threading.Lock()
+
+def get_instantly():
+    """Return the shared InstantlyIntegration for the configured API key (None if unset)"""
+    global _instantly_client
+    api_key = INSTANTLY_API_KEY
+    if not api_key:
+        return None
+    with _instantly_lock:
+        # Rebuild if the key was changed via /api/instantly/configure
+        if _instantly_client is None or _instantly_client.api_key != api_key:
+            _instantly_client = InstantlyIntegration(api_key)
+        return _instantly_client
+
+def adopt_instantly_client(client):
+    """Make an already-validated client the shared one, keeping its warm connections"""
+    global _instantly_client
+    with _instantly_lock:
+        _instantly_client = client
+
 # Initialize scheduler
 scheduler = LeadScheduler()
 
@@ -258,7 +408,7 @@ search_history = SearchHistoryManager()
 
 def process_scheduled_search(query: str, limit: int, verify_emails: bool, generate_emails: bool = False):
     """Process a scheduled search"""
-    job_id = f"scheduled_{int(time.time())}"
+    job_id = f"scheduled_{secrets.token_hex(8)}"
     job = LeadGenerationJob(job_id, query, limit, verify_emails=verify_emails, generate_emails=generate_emails)
     jobs[job_id] = job
     
@@ -275,6 +425,26 @@ def process_scheduled_search(query: str, limit: int, verify_emails: bool, genera
 # Start the scheduler with the processing callback
 scheduler.start(process_callback=process_scheduled_search)
 
+def split_search_query(formatted_query):
+    """Split a search query into (keyword, location).
+    
+    Typical format: "keyword in location" or "keyword location".
+    """
+    query_parts = formatted_query.split(' in ')
+    if len(query_parts) == 2:
+        return query_parts[0].strip(), query_parts[1].strip()
+    
+    # Fallback: assume last 2-3 words are location
+    words = formatted_query.split()
+    if len(words) >= 3:
+        # Common patterns: "lawyers las vegas", "coffee shops austin"
+        # Check if last words look like a location
+        potential_location_words = 2 if len(words) > 4 else min(2, len(words) - 1)
+        return ' '.join(words[:-potential_location_words]), ' '.join(words[-potential_location_words:])
+    elif len(words) == 2:
+        return words[0], words[1]
+    return formatted_query, ''
+
 class LeadGenerationJob:
     def __init__(self, job_id, query, limit, industry='default', verify_emails=False, generate_emails=False, export_verified_only=False, advanced_scraping=False, queries=None, add_to_instantly=False, instantly_campaign=''):
         self.job_id = job_id
@@ -302,6 +472,8 @@ class LeadGenerationJob:
         self.total_leads = 0
         self.emails_verified = 0
         self.valid_emails = 0
+        self.verified_count = None  # Rows in result_file eligible for Instantly; None if unknown
+        self.future = None  # Set when the job is submitted to JOB_EXECUTOR
         
     def to_dict(self):
         return {
@@ -317,6 +489,7 @@ class LeadGenerationJob:
             'total_leads': self.total_leads,
             'emails_verified': self.emails_verified,
             'valid_emails': self.valid_emails,
+            'verified_count': self.verified_count,
             'leads_preview': self.leads_data[:50] if self.leads_data else []  # Show first 50 leads
         }
 
@@ -367,6 +540,9 @@ def process_leads(job):
                 raw_leads_for_query = provider.fetch_places(formatted_query, effective_limit)
                 logger.info(f"Provider returned {len(raw_leads_for_query) if raw_leads_for_query else 0} leads for '{formatted_query}'")
                 
+                # Parse keyword/location once per query rather than once per lead
+                search_keyword, location = split_search_query(formatted_query)
+                
                 # Add leads from this query, deduplicating as we go
                 query_leads_added = 0
                 for lead in raw_leads_for_query or []:
@@ -381,29 +557,7 @@ def process_leads(job):
                     
                     if unique_identifier and unique_identifier not in seen_places:
                         seen_places.add(unique_identifier)
-                        # Add the search query to each lead so we know what search found it
-                        # Parse out the keyword and location from the formatted query
-                        # Typical format: "keyword in location" or "keyword location"
-                        query_parts = formatted_query.split(' in ')
-                        if len(query_parts) == 2:
-                            search_keyword = query_parts[0].strip()
-                            location = query_parts[1].strip()
-                        else:
-                            # Fallback: assume last 2-3 words are location
-                            words = formatted_query.split()
-                            if len(words) >= 3:
-                                # Common patterns: "lawyers las vegas", "coffee shops austin"
-                                # Check if last words look like a location
-                                potential_location_words = 2 if len(words) > 4 else min(2, len(words) - 1)
-                                search_keyword = ' '.join(words[:-potential_location_words])
-                                location = ' '.join(words[-potential_location_words:])
-                            elif len(words) == 2:
-                                search_keyword = words[0]
-                                location = words[1]
-                            else:
-                                search_keyword = formatted_query
-                                location = ''
-                        
+                        # Tag each lead with the search that found it
                         lead['search_keyword'] = search_keyword
                         lead['search_location'] = location
                         lead['full_query'] = formatted_query
@@ -497,7 +651,7 @@ def process_leads(job):
             logger.error(f"Website scraping failed: {e}")
         
         # Step 2.5: Email Verification (if enabled) - PARALLEL PROCESSING
-        if job.verify_emails and os.getenv('MAILTESTER_API_KEY'):
+        if job.verify_emails and MAILTESTER_API_KEY:
             job.status = "verifying_emails"
             job.progress = 35
             job.message = "Verifying email addresses..."
@@ -622,7 +776,7 @@ def process_leads(job):
             print("FLASK DEBUG: Taking email generation branch")
             logger.info("DEBUG: Taking email generation branch")
             
-            email_gen = EmailGenerator(industry=job.industry)
+            email_gen = get_email_generator(job.industry)
             final_leads = []
             
             for i, lead in enumerate(scored_leads):
@@ -692,8 +846,7 @@ def process_leads(job):
         # Debug: Print the original query
         print(f"FLASK DEBUG: Original job.query: '{job.query}'")
         # Sanitize query for filename - remove invalid filename characters
-        import re
-        safe_query = re.sub(r'[<>:"/\\|?*]', '_', job.query.replace(' ', '_'))[:30]
+        safe_query = safe_query_filename(job.query, max_length=30)
         print(f"FLASK DEBUG: Sanitized safe_query: '{safe_query}'")
         filename = f"{date_str}_{safe_query}.csv"
         print(f"FLASK DEBUG: Final filename: '{filename}'")
@@ -809,21 +962,25 @@ def process_leads(job):
             renamed_columns.append(renamed_col)
         columns = renamed_columns
         
-        # Log DataFrame info
-        logger.info(f"DataFrame shape: {df.shape}")
-        logger.info(f"Standardized CSV columns: {list(df.columns)}")
-        logger.info(f"Expected columns after rename: {columns}")
-        if not df.empty:
-            logger.info(f"First row data: {df.iloc[0].to_dict()}")
+        # Log DataFrame info (only build the row dict when debug logging is on)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("DataFrame shape=%s columns=%s expected=%s first=%s",
+                         df.shape, list(df.columns), columns,
+                         df.iloc[0].to_dict() if not df.empty else None)
         
-        # Ensure all columns exist
-        for col in columns:
-            if col not in df.columns:
-                df[col] = 'NA'
+        # Build the Instantly candidate mask now, while the verification columns are still present
+        instantly_mask = None
+        if not df.empty:
+            verified_mask = verified_email_mask(df)
+            # Recorded so Instantly re-imports can skip jobs with nothing to send
+            job.verified_count = int(verified_mask.sum())
+            if job.add_to_instantly and job.instantly_campaign:
+                instantly_mask = verified_mask
+        else:
+            job.verified_count = 0
         
-        # Reorder columns - only select columns that exist
-        available_columns = [col for col in columns if col in df.columns]
-        df = df[available_columns]
+        # Ensure all columns exist and reorder them in a single pass
+        df = df.reindex(columns=columns, fill_value='NA')
         
         # Ensure SearchKeyword/Location are filled before save
         try:
@@ -847,6 +1004,8 @@ def process_leads(job):
         logger.info(f"Saving CSV to {filepath} with {len(df)} rows")
         df.to_csv(filepath, index=False)
         job.result_file = filepath
+        # Typed columnar copy so Instantly re-imports don't have to re-parse the CSV
+        write_parquet_sidecar(filepath)
         
         # Step 6: Skip Google Drive - just save locally
         job.status = "finalizing"
@@ -864,19 +1023,10 @@ def process_leads(job):
                 job.progress = 95
                 job.message = "Adding leads to Instantly campaign..."
                 
-                api_key = os.getenv('INSTANTLY_API_KEY')
+                api_key = INSTANTLY_API_KEY
                 if api_key:
-                    # STRICT: Only send verified valid emails
-                    leads_for_instantly = [
-                        lead for lead in final_leads
-                        if (
-                            str(lead.get('Email', '')).strip() not in ('', 'NA') and (
-                                str(lead.get('email_status', '')).lower() == 'valid' or
-                                str(lead.get('Email_Status', '')).lower() == 'valid' or
-                                str(lead.get('Email_Verified', '')).lower() in ('true', '1', 'yes')
-                            )
-                        )
-                    ]
+                    # STRICT: Only send verified valid emails (mask rows line up with final_leads)
+                    leads_for_instantly = list(compress(final_leads, instantly_mask.tolist())) if instantly_mask is not None else []
                     
                     if leads_for_instantly:
                         print(f"\n{'#'*60}")
@@ -884,7 +1034,7 @@ def process_leads(job):
                         print(f"FLASK: Campaign ID: {job.instantly_campaign}")
                         print(f"FLASK: API Key present: {bool(api_key)}")
                         
-                        instantly = InstantlyIntegration(api_key)
+                        instantly = get_instantly()
                         instantly_leads = convert_r27_leads_to_instantly(leads_for_instantly)
                         
                         print(f"FLASK: Converted to {len(instantly_leads)} Instantly lead objects")
@@ -963,19 +1113,26 @@ def process_leads(job):
         # Persist errored job so it shows up in completed list
         save_completed_job(job)
 
+# Rendered index.html, rebuilt only when the template file changes
+_index_cache = {'mtime': 0, 'html': None}
+
 @app.route('/')
 def index():
     """Render the main page with cache-busting headers"""
     from flask import make_response
-    import time
     
-    # Create response with cache-busting
-    response = make_response(render_template('index.html', cache_buster=int(time.time())))
+    # Re-render only when the template changes; its mtime doubles as the cache-buster
+    tpl_path = os.path.join(app.root_path, app.template_folder, 'index.html')
+    mtime = os.path.getmtime(tpl_path)
+    if mtime != _index_cache['mtime'] or _index_cache['html'] is None:
+        _index_cache['html'] = render_template('index.html', cache_buster=int(mtime))
+        _index_cache['mtime'] = mtime
+    
+    response = make_response(_index_cache['html'])
     
-    # Add headers to prevent caching
-    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    # Add headers to prevent caching (no-store already rules out Expires/must-revalidate)
+    response.headers['Cache-Control'] = 'no-cache, no-store'
     response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
     
     return response
 
@@ -1029,16 +1186,16 @@ def debug_logs_stream():
         try:
             # Send recent logs first
             for log_entry in list(debug_logs):
-                yield f"data: {json.dumps(log_entry)}\n\n"
+                yield f"data: {dumps_json(log_entry)}\n\n"
             
             # Then stream new logs
             while True:
                 try:
                     log_entry = subscriber_queue.get(timeout=30)
-                    yield f"data: {json.dumps(log_entry)}\n\n"
+                    yield f"data: {dumps_json(log_entry)}\n\n"
                 except queue.Empty:
                     # Send keepalive
-                    yield f"data: {json.dumps({'keepalive': True})}\n\n"
+                    yield f"data: {dumps_json({'keepalive': True})}\n\n"
         finally:
             if subscriber_queue in log_subscribers:
                 log_subscribers.remove(subscriber_queue)
@@ -1082,13 +1239,12 @@ def generate_leads():
     return handle_multi_provider_generate(data)
     
     # Legacy single-provider code removed
-    job_id = f"job_{int(time.time())}"
+    job_id = f"job_{secrets.token_hex(8)}"
     job = LeadGenerationJob(job_id, query, limit, industry, verify_emails, generate_emails, export_verified_only, advanced_scraping, queries, add_to_instantly, instantly_campaign)
     jobs[job_id] = job
     
     # Start processing in background
-    thread = threading.Thread(target=process_leads, args=(job,))
-    thread.start()
+    job.future = JOB_EXECUTOR.submit(process_leads, job)
     
     return jsonify({'job_id': job_id})
 
@@ -1107,7 +1263,7 @@ def handle_multi_provider_generate(data):
         
         logger.info(f"Multi-provider search: {providers} for query: {query}")
         
-        job_id = f"multi_job_{int(time.time())}"
+        job_id = f"multi_job_{secrets.token_hex(8)}"
         
         # Create a modified job for multi-provider
         job = LeadGenerationJob(
@@ -1126,8 +1282,7 @@ def handle_multi_provider_generate(data):
         jobs[job_id] = job
         
         # Process multi-provider search
-        thread = threading.Thread(target=process_multi_provider_leads, args=(job, providers))
-        thread.start()
+        job.future = JOB_EXECUTOR.submit(process_multi_provider_leads, job, providers)
         
         return jsonify({'job_id': job_id})
         
@@ -1264,6 +1419,10 @@ def cancel_job(job_id):
     
     job = jobs[job_id]
     
+    # Drop the job from the pool if a worker hasn't picked it up yet
+    if job.future is not None:
+        job.future.cancel()
+    
     # Mark job as cancelled
     job.cancelled = True
     job.status = 'cancelled'
@@ -1276,6 +1435,31 @@ def cancel_job(job_id):
         'message': 'Job cancelled successfully'
     })
 
+# Newest CSV in output/, memoized briefly so burst polling doesn't rescan the directory
+NEWEST_CSV_TTL = 1.0
+_newest_csv_cache = {'path': None, 'checked_at': 0.0}
+
+def _newest_output_csv(output_dir='output'):
+    """Return the most recently modified CSV in output_dir, or None"""
+    now = time.monotonic()
+    if now - _newest_csv_cache['checked_at'] < NEWEST_CSV_TTL:
+        return _newest_csv_cache['path']
+    
+    newest = None
+    try:
+        with os.scandir(output_dir) as it:
+            newest = max(
+                (e for e in it if e.name.endswith('.csv') and e.is_file()),
+                key=lambda e: e.stat().st_mtime,
+                default=None
+            )
+    except FileNotFoundError:
+        pass
+    
+    _newest_csv_cache['path'] = newest.path if newest else None
+    _newest_csv_cache['checked_at'] = now
+    return _newest_csv_cache['path']
+
 @app.route('/api/download/<job_id>')
 def download_csv(job_id):
     """Download the CSV file"""
@@ -1294,23 +1478,9 @@ def download_csv(job_id):
             return send_file(result_file, as_attachment=True, mimetype='text/csv')
     
     # Fallback: Look for the most recent file that matches this job pattern
-    output_dir = 'output'
-    if os.path.exists(output_dir):
-        # Get all CSV files, sorted by modification time (newest first)
-        csv_files = []
-        for filename in os.listdir(output_dir):
-            if filename.endswith('.csv'):
-                filepath = os.path.join(output_dir, filename)
-                if os.path.isfile(filepath):
-                    csv_files.append((filepath, os.path.getmtime(filepath)))
-        
-        # Sort by modification time, newest first
-        csv_files.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return the most recent CSV file
-        if csv_files:
-            most_recent_file = csv_files[0][0]
-            return send_file(most_recent_file, as_attachment=True, mimetype='text/csv')
+    most_recent_file = _newest_output_csv()
+    if most_recent_file and os.path.exists(most_recent_file):
+        return send_file(most_recent_file, as_attachment=True, mimetype='text/csv')
     
     return jsonify({'error': 'File not found'}), 404
 
@@ -1414,10 +1584,8 @@ def get_debug_info():
     # Get recent logs from the file
     recent_logs = []
     try:
-        with open('logs/flask_app.log', 'r') as f:
-            lines = f.readlines()[-50:]  # Get last 50 lines
-            for line in lines:
-                recent_logs.append(line.strip())
+        # Read only the tail of the file - the log can grow to hundreds of MB
+        recent_logs = [line.strip() for line in tail_lines('logs/flask_app.log', 50)]
     except Exception as e:
         recent_logs = [f"Error reading log file: {str(e)}"]
     
@@ -1469,30 +1637,45 @@ class ApolloJob:
         self.filename = filename
         self.max_leads = max_leads
         self.service_focus = service_focus
-        self.status = "processing"
-        self.progress = 0
-        self.total_leads = 0
-        self.processed_leads = 0
-        self.message = "Starting..."
-        self.result_file = None
-        self.error = None
         self.cancelled = False
-        
-    def to_dict(self):
-        return {
-            'job_id': self.job_id,
-            'status': self.status,
-            'progress': self.progress,
-            'total_leads': self.total_leads,
-            'processed_leads': self.processed_leads,
-            'message': self.message,
-            'result_file': self.result_file,
-            'error': self.error
+        self.future = None  # Set when the job is submitted to JOB_EXECUTOR
+        # Progress fields live in one dict that the worker replaces wholesale under
+        # the lock, so status readers never see e.g. a new progress with an old message
+        self._lock = threading.Lock()
+        self._state = {
+            'status': "processing",
+            'progress': 0,
+            'total_leads': 0,
+            'processed_leads': 0,
+            'message': "Starting...",
+            'result_file': None,
+            'error': None
         }
+    
+    def __getattr__(self, name):
+        # Expose state fields as read-only attributes (job.status, job.progress, ...)
+        state = self.__dict__.get('_state')
+        if state is not None and name in state:
+            return state[name]
+        raise AttributeError(name)
+    
+    def update(self, **changes):
+        """Atomically apply a set of state changes"""
+        with self._lock:
+            self._state = {**self._state, **changes}
+    
+    def to_dict(self):
+        with self._lock:
+            snapshot = dict(self._state)
+        snapshot['job_id'] = self.job_id
+        return snapshot
 
 # Store Apollo jobs
 apollo_jobs = {}
 
+# Column order of the personalized Apollo output CSV
+APOLLO_RESULT_FIELDS = ['first_name', 'title', 'company', 'email', 'personalized_email']
+
 def process_apollo_background(job):
     """Background task to process Apollo CSV"""
     temp_path = job.filename
@@ -1503,8 +1686,9 @@ def process_apollo_background(job):
         total_in_file = len(df)
         
         # Limit processing
-        job.total_leads = min(total_in_file, job.max_leads)
-        job.message = f"Processing {job.total_leads} of {total_in_file} leads..."
+        total_leads = min(total_in_file, job.max_leads)
+        job.update(total_leads=total_leads,
+                   message=f"Processing {total_leads} of {total_in_file} leads...")
         
         if total_in_file > job.max_leads:
             df = df.head(job.max_leads)
@@ -1517,52 +1701,57 @@ def process_apollo_background(job):
         output_filename = f"apollo_personalized_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         output_path = os.path.join('output', output_filename)
         
-        # Process each lead with progress updates
-        results = []
-        for idx, lead in df.iterrows():
-            if job.cancelled:
-                job.status = "cancelled"
-                job.message = "Processing cancelled by user"
-                break
-                
-            try:
-                # Process single lead
-                analysis = processor.analyze_lead(lead)
-                email = processor.smart_personalizer.generate_personalized_email(lead.to_dict())
-                
-                result = {
-                    'first_name': analysis['first_name'],
-                    'title': analysis['title'],
-                    'company': analysis['company'],
-                    'email': analysis['email'],
-                    'personalized_email': email
-                }
-                results.append(result)
-                
-                # Update progress
-                job.processed_leads = idx + 1
-                job.progress = int((job.processed_leads / job.total_leads) * 100)
-                job.message = f"Processed {job.processed_leads}/{job.total_leads} leads"
-                
-            except Exception as e:
-                logger.error(f"Error processing lead {idx}: {e}")
-                continue
-        
-        if not job.cancelled:
-            # Save results
-            results_df = pd.DataFrame(results)
-            results_df.to_csv(output_path, index=False)
+        # Process each lead with progress updates, streaming rows straight to the CSV
+        written = 0
+        update_every = max(1, total_leads // 100)
+        next_update = 0
+        with open(output_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as out_f:
+            writer = csv.DictWriter(out_f, fieldnames=APOLLO_RESULT_FIELDS)
+            writer.writeheader()
             
-            job.result_file = output_filename
-            job.status = "completed"
-            job.progress = 100
-            job.message = f"Successfully processed {len(results)} leads!"
+            for idx, lead in df.iterrows():
+                if job.cancelled:
+                    job.update(status="cancelled", message="Processing cancelled by user")
+                    break
+                    
+                try:
+                    # Process single lead
+                    analysis = processor.analyze_lead(lead)
+                    email = processor.smart_personalizer.generate_personalized_email(lead.to_dict())
+                    
+                    writer.writerow({
+                        'first_name': analysis['first_name'],
+                        'title': analysis['title'],
+                        'company': analysis['company'],
+                        'email': analysis['email'],
+                        'personalized_email': email
+                    })
+                    written += 1
+                    
+                    # Update progress, reformatting the message only about once per percent
+                    processed = idx + 1
+                    if processed >= next_update or processed == total_leads:
+                        job.update(processed_leads=processed,
+                                   progress=int((processed / total_leads) * 100),
+                                   message=f"Processed {processed}/{total_leads} leads")
+                        next_update = processed + update_every
+                    
+                except Exception as e:
+                    logger.error(f"Error processing lead {idx}: {e}")
+                    continue
+        
+        if job.cancelled:
+            # Don't leave a partial result behind for a cancelled job
+            os.remove(output_path)
+        else:
+            job.update(result_file=output_filename,
+                       status="completed",
+                       progress=100,
+                       message=f"Successfully processed {written} leads!")
         
     except Exception as e:
         logger.error(f"Apollo job failed: {e}", exc_info=True)
-        job.status = "error"
-        job.error = str(e)
-        job.message = "Processing failed"
+        job.update(status="error", error=str(e), message="Processing failed")
     
     finally:
         # Clean up temp file
@@ -1579,20 +1768,21 @@ def process_apollo():
     if file.filename == '' or not file.filename.endswith('.csv'):
         return jsonify({'error': 'Please upload a CSV file'}), 400
     
-    # Save uploaded file temporarily
-    temp_path = os.path.join('output', f'temp_apollo_{int(time.time())}.csv')
-    file.save(temp_path)
+    # Save uploaded file temporarily under a unique name
+    os.makedirs('output', exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir='output', prefix='temp_apollo_', suffix='.csv', delete=False) as tmp:
+        file.save(tmp)
+        temp_path = tmp.name
     
     # Create job
-    job_id = f"apollo_{int(time.time())}"
+    job_id = f"apollo_{secrets.token_hex(8)}"
     max_leads = int(request.form.get('max_leads', 100))
     service_focus = request.form.get('service_focus', 'general_automation')
     job = ApolloJob(job_id, temp_path, max_leads, service_focus)
     apollo_jobs[job_id] = job
     
     # Start processing in background
-    thread = threading.Thread(target=process_apollo_background, args=(job,))
-    thread.start()
+    job.future = JOB_EXECUTOR.submit(process_apollo_background, job)
     
     return jsonify({'job_id': job_id})
 
@@ -1610,7 +1800,13 @@ def apollo_cancel(job_id):
     if job_id not in apollo_jobs:
         return jsonify({'error': 'Job not found'}), 404
     
-    apollo_jobs[job_id].cancelled = True
+    job = apollo_jobs[job_id]
+    if job.future is not None and job.future.cancel():
+        # Never started, so the worker won't clean up the uploaded temp file
+        job.update(status="cancelled", message="Processing cancelled by user")
+        if os.path.exists(job.filename):
+            os.remove(job.filename)
+    job.cancelled = True
     return jsonify({'success': True, 'message': 'Job cancelled'})
 
 @app.route('/api/download-apollo/<filename>')
@@ -1670,9 +1866,9 @@ def get_popular_searches():
     return jsonify(popular)
 
 # CSV Template Download
-@app.route('/api/csv-template')
-def download_csv_template():
-    """Download CSV template for bulk upload"""
+@functools.lru_cache(maxsize=1)
+def csv_template_bytes():
+    """The bulk upload CSV template, built once"""
     template_data = {
         'name': ['Search 1', 'Search 2', 'Search 3'],
         'query': ['dentists in New York', 'lawyers in Los Angeles', 'restaurants in Chicago'],
@@ -1683,14 +1879,48 @@ def download_csv_template():
         'interval_hours': [0, 0, 24],
         'interval_minutes': [15, 30, 0]
     }
-    df = pd.DataFrame(template_data)
-    
-    # Create temp file
-    temp_file = 'temp/search_template.csv'
-    os.makedirs('temp', exist_ok=True)
-    df.to_csv(temp_file, index=False)
-    
-    return send_file(temp_file, as_attachment=True, download_name='search_template.csv')
+    return pd.DataFrame(template_data).to_csv(index=False).encode('utf-8')
+
+@app.route('/api/csv-template')
+def download_csv_template():
+    """Download CSV template for bulk upload"""
+    return send_file(io.BytesIO(csv_template_bytes()), as_attachment=True,
+                     download_name='search_template.csv', mimetype='text/csv',
+                     max_age=STATIC_CACHE_SECONDS)
+
+def _xlsx_cell(value):
+    """Coerce a lead value into something xlsxwriter can write"""
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    if isinstance(value, (list, dict, set, tuple)):
+        return str(value)
+    return value
+
+def write_leads_xml(leads, target):
+    """Stream lead dicts out as <leads><lead>...</lead></leads>, one element at a time"""
+    with etree.xmlfile(target, encoding='utf-8') as xf:
+        xf.write_declaration()
+        with xf.element('leads'):
+            for lead in leads:
+                with xf.element('lead'):
+                    for key, value in lead.items():
+                        el = etree.Element(key)
+                        # None and NaN become empty elements, as with DataFrame.to_xml
+                        el.text = '' if value is None or value != value else str(value)
+                        xf.write(el)
+
+def write_leads_xlsx(leads, target):
+    """Write lead dicts to an xlsx sheet row by row in constant-memory mode"""
+    # Same column order a DataFrame would use: keys in order of first appearance
+    headers = list(dict.fromkeys(key for lead in leads for key in lead))
+    workbook = xlsxwriter.Workbook(target, {'constant_memory': True})
+    try:
+        worksheet = workbook.add_worksheet('Leads')
+        worksheet.write_row(0, 0, headers)
+        for row_idx, lead in enumerate(leads, start=1):
+            worksheet.write_row(row_idx, 0, [_xlsx_cell(lead.get(h)) for h in headers])
+    finally:
+        workbook.close()
 
 # Export in different formats
 @app.route('/api/export/<job_id>/<format>')
@@ -1703,26 +1933,36 @@ def export_format(job_id, format):
     if not job.leads_data:
         return jsonify({'error': 'No data to export'}), 404
     
-    # Create temp directory
-    os.makedirs('temp', exist_ok=True)
+    # Build each export in memory and hand the buffer straight to send_file
+    buf = io.BytesIO()
     
     if format == 'json':
-        temp_file = f'temp/{job_id}.json'
-        with open(temp_file, 'w') as f:
-            json.dump(job.leads_data, f, indent=2)
-        return send_file(temp_file, as_attachment=True, download_name=f'{job.query}.json')
+        if ORJSON_AVAILABLE:
+            buf.write(orjson.dumps(job.leads_data, default=DefaultJSONProvider.default,
+                                   option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            buf.write(json.dumps(job.leads_data, indent=2).encode('utf-8'))
+        buf.seek(0)
+        return send_file(buf, as_attachment=True, download_name=f'{job.query}.json', mimetype='application/json')
     
     elif format == 'xml':
-        temp_file = f'temp/{job_id}.xml'
-        df = pd.DataFrame(job.leads_data)
-        df.to_xml(temp_file, root_name='leads', row_name='lead')
-        return send_file(temp_file, as_attachment=True, download_name=f'{job.query}.xml')
+        if LXML_AVAILABLE:
+            write_leads_xml(job.leads_data, buf)
+        else:
+            df = pd.DataFrame(job.leads_data)
+            df.to_xml(buf, root_name='leads', row_name='lead', parser='etree')
+        buf.seek(0)
+        return send_file(buf, as_attachment=True, download_name=f'{job.query}.xml', mimetype='application/xml')
     
     elif format == 'xlsx':
-        temp_file = f'temp/{job_id}.xlsx'
-        df = pd.DataFrame(job.leads_data)
-        df.to_excel(temp_file, index=False, sheet_name='Leads')
-        return send_file(temp_file, as_attachment=True, download_name=f'{job.query}.xlsx')
+        if XLSXWRITER_AVAILABLE:
+            write_leads_xlsx(job.leads_data, buf)
+        else:
+            df = pd.DataFrame(job.leads_data)
+            df.to_excel(buf, index=False, sheet_name='Leads')
+        buf.seek(0)
+        return send_file(buf, as_attachment=True, download_name=f'{job.query}.xlsx',
+                         mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
     
     else:
         return jsonify({'error': 'Invalid format. Use json, xml, or xlsx'}), 400
@@ -1734,8 +1974,7 @@ def bulk_delete_queue():
     data = request.json
     queue_ids = data.get('queue_ids', [])
     
-    for queue_id in queue_ids:
-        scheduler.cancel_queue_item(queue_id)
+    scheduler.cancel_queue_items(queue_ids)
     
     return jsonify({'success': True, 'deleted': len(queue_ids)})
 
@@ -1752,25 +1991,38 @@ def get_providers_status():
     from src.providers import get_available_providers
     
     providers = get_available_providers()
-    status = []
     
-    for provider_name in providers:
+    def probe(provider_name):
         try:
-            provider = get_provider(provider_name)
+            provider = cached_provider(provider_name)
             # Test with a simple query
-            test_results = provider.fetch_places("test", 1)
-            status.append({
+            test_results = cached_probe(provider, "test", 1)
+            return {
                 'name': provider_name,
                 'status': 'active',
                 'available': True,
                 'test_success': len(test_results) > 0 if test_results else False
-            })
+            }
         except Exception as e:
-            status.append({
+            return {
                 'name': provider_name,
                 'status': 'error',
                 'available': False,
                 'error': str(e)
+            }
+    
+    # Probe all providers concurrently so latency is the slowest probe, not the sum
+    futures = [PROBE_EXECUTOR.submit(probe, name) for name in providers]
+    status = []
+    for provider_name, future in zip(providers, futures):
+        try:
+            status.append(future.result(timeout=PROBE_TIMEOUT))
+        except FuturesTimeoutError:
+            status.append({
+                'name': provider_name,
+                'status': 'error',
+                'available': False,
+                'error': f'Probe timed out after {PROBE_TIMEOUT}s'
             })
     
     return jsonify(status)
@@ -1779,13 +2031,13 @@ def get_providers_status():
 def health_check():
     """Health check endpoint"""
     # Test provider
-    provider = get_provider('auto')
+    provider = cached_provider('auto')
     provider_name = provider.__class__.__name__
     
     # Test fetching
     test_results = []
     try:
-        test_results = provider.fetch_places("coffee shop Austin", 1)
+        test_results = cached_probe(provider)
     except:
         pass
     
@@ -1795,7 +2047,7 @@ def health_check():
         'google_api_key': False,  # Google API removed
         'google_api_key_value': 'Not used - free providers only',
         'test_fetch_worked': len(test_results) > 0,
-        'openai_configured': bool(os.getenv('OPENAI_API_KEY')),
+        'openai_configured': bool(OPENAI_API_KEY),
         'available_industries': IndustryConfig.get_industry_display_names()
     })
 
@@ -1869,6 +2121,10 @@ def get_history():
     history = scheduler.get_history(schedule_id, limit)
     return jsonify(history)
 
+# Columns bulk_upload_schedules reads; anything else in the CSV is skipped while parsing
+SCHEDULE_CSV_COLUMNS = frozenset({'name', 'query', 'limit_leads', 'verify_emails', 'interval_minutes',
+                                  'interval_hours', 'expand_keywords', 'max_variants'})
+
 @app.route('/api/schedules/bulk-upload', methods=['POST'])
 def bulk_upload_schedules():
     """Upload multiple schedules from CSV"""
@@ -1880,44 +2136,76 @@ def bulk_upload_schedules():
         return jsonify({'error': 'Please upload a CSV file'}), 400
     
     try:
-        # Read CSV
-        df = pd.read_csv(file)
+        # Match the header (case- and whitespace-insensitively) before parsing the body
+        header = next(csv.reader([file.stream.readline().decode('utf-8-sig')]), [])
+        file.stream.seek(0)
+        col_map = {}
+        for col in header:
+            key = col.strip().lower()
+            if key in SCHEDULE_CSV_COLUMNS and key not in col_map.values():
+                col_map[col] = key
         
         # Validate required columns
         required_cols = ['name', 'query', 'limit_leads']
-        if not all(col in df.columns for col in required_cols):
+        if not set(required_cols).issubset(col_map.values()):
             return jsonify({'error': f'CSV must contain columns: {", ".join(required_cols)}'}), 400
         
+        # Parse only the columns we use, as plain strings - every cell is parsed
+        # explicitly below, so skip pandas' type inference
+        df = pd.read_csv(file, usecols=list(col_map), dtype=str, keep_default_na=False, engine='c')
+        df.rename(columns=col_map, inplace=True)
+        
         # Process each row with staggered scheduling
         added_schedules = []
+        pending_queue = []
         errors = []
         
         # Default interval between searches (in minutes)
         default_interval_minutes = 15
         base_time = datetime.now()
         
-        for idx, row in df.iterrows():
+        # Parse and normalize every column in one pass; cells that don't parse
+        # become NaN and are reported as row errors below
+        def int_column(col, default):
+            if col not in df.columns:
+                return pd.Series(default, index=df.index, dtype=float)
+            return pd.to_numeric(df[col].str.strip(), errors='coerce')
+        
+        def flag_column(col):
+            if col not in df.columns:
+                return pd.Series(False, index=df.index)
+            return df[col].str.strip().str.lower().eq('true')
+        
+        # Handle "max" as limit_leads value (1000 is the maximum allowed)
+        limit_col = pd.to_numeric(
+            df['limit_leads'].str.strip().str.lower().replace('max', '1000'), errors='coerce')
+        minutes_col = int_column('interval_minutes', default_interval_minutes)
+        hours_col = int_column('interval_hours', 0)
+        invalid_col = limit_col.isna() | minutes_col.isna() | hours_col.isna()
+        
+        limit_col = limit_col.fillna(0).astype(int)
+        minutes_col = minutes_col.fillna(0).astype(int)
+        hours_col = hours_col.fillna(0).astype(int)
+        # Staggered start times, computed BEFORE expansion logic
+        scheduled_col = base_time + pd.to_timedelta(minutes_col * pd.RangeIndex(len(df)), unit='m')
+        
+        rows = zip(
+            df.to_dict('records'),
+            invalid_col.tolist(),
+            limit_col.tolist(),
+            flag_column('verify_emails').tolist(),
+            hours_col.tolist(),
+            scheduled_col.tolist(),
+            flag_column('expand_keywords').tolist(),
+        )
+        for idx, (row, invalid, limit_leads, verify_emails, interval_hours,
+                  scheduled_time, expand_keywords) in enumerate(rows):
             try:
-                # Get values with defaults
-                name = str(row['name'])
-                query = str(row['query'])
+                if invalid:
+                    raise ValueError('limit_leads, interval_minutes and interval_hours must be whole numbers')
                 
-                # Handle "max" as limit_leads value
-                limit_str = str(row.get('limit_leads', '25')).lower()
-                if limit_str == 'max':
-                    limit_leads = 1000  # Maximum allowed
-                else:
-                    limit_leads = int(limit_str)
-                    
-                verify_emails = str(row.get('verify_emails', 'false')).lower() == 'true'
-                
-                # Get interval and calculate scheduled time BEFORE expansion logic
-                interval_minutes = int(row.get('interval_minutes', default_interval_minutes))
-                scheduled_time = base_time + timedelta(minutes=interval_minutes * idx)
-                interval_hours = int(row.get('interval_hours', 0))
-                
-                # Check if expand keywords is enabled for this row
-                expand_keywords = str(row.get('expand_keywords', 'false')).lower() == 'true'
+                name = row['name']
+                query = row['query']
                 
                 # If expand is enabled, generate keyword variants
                 if expand_keywords and 'KeywordExpander' in globals():
@@ -1968,18 +2256,18 @@ def bulk_upload_schedules():
                                     'expanded': True
                                 })
                             else:
-                                variant_queue_id = scheduler.add_to_queue(
-                                    query=variant,
-                                    limit_leads=limit_leads,
-                                    verify_emails=verify_emails,
-                                    priority=1,
-                                    scheduled_time=variant_scheduled_time.isoformat() if variant_scheduled_time else None
-                                )
+                                pending_queue.append({
+                                    'query': variant,
+                                    'limit_leads': limit_leads,
+                                    'verify_emails': verify_emails,
+                                    'priority': 1,
+                                    'scheduled_time': variant_scheduled_time.isoformat() if variant_scheduled_time else None
+                                })
                                 added_schedules.append({
                                     'row': idx + 1,
                                     'name': f"{name} - Variant {variant_idx + 1}",
                                     'type': 'queue',
-                                    'id': variant_queue_id,
+                                    'id': None,  # Filled in once the queue rows are inserted
                                     'expanded': True
                                 })
                         
@@ -2006,18 +2294,18 @@ def bulk_upload_schedules():
                     })
                 else:
                     # Add directly to queue for one-time execution with scheduled time
-                    queue_id = scheduler.add_to_queue(
-                        query=query,
-                        limit_leads=limit_leads,
-                        verify_emails=verify_emails,
-                        priority=1,  # All same priority = process in order
-                        scheduled_time=scheduled_time.isoformat() if scheduled_time else None
-                    )
+                    pending_queue.append({
+                        'query': query,
+                        'limit_leads': limit_leads,
+                        'verify_emails': verify_emails,
+                        'priority': 1,  # All same priority = process in order
+                        'scheduled_time': scheduled_time.isoformat() if scheduled_time else None
+                    })
                     added_schedules.append({
                         'row': idx + 1,
                         'name': name,
                         'type': 'queue',
-                        'id': queue_id,
+                        'id': None,
                         'scheduled_time': scheduled_time.strftime('%Y-%m-%d %H:%M:%S')
                     })
                     
@@ -2027,6 +2315,12 @@ def bulk_upload_schedules():
                     'error': str(e)
                 })
         
+        # One-time searches go into the queue in a single transaction
+        queue_ids = iter(scheduler.add_many_to_queue(pending_queue))
+        for entry in added_schedules:
+            if entry['type'] == 'queue':
+                entry['id'] = next(queue_ids)
+        
         return jsonify({
             'success': True,
             'added': added_schedules,
@@ -2049,25 +2343,27 @@ def download_schedule_template():
 
 # Enhanced Provider and Enrichment Endpoints
 
+AVAILABLE_PROVIDERS = {
+    # Google Maps removed from available providers
+    'openstreetmap': {
+        'name': 'OpenStreetMap Overpass API',
+        'configured': True,  # Always available
+        'description': 'Free open-source business directory',
+        'cost': 'Completely Free'
+    },
+    'yellowpages': {
+        'name': 'Yellow Pages API',
+        'configured': True,  # Hosted API, no key required
+        'description': 'US business directory via hosted API',
+        'cost': 'Free'
+    }
+}
+_AVAILABLE_PROVIDERS_JSON = dumps_json(AVAILABLE_PROVIDERS)
+
 @app.route('/api/providers/available', methods=['GET'])
 def get_provider_status():
     """Get list of available data providers"""
-    providers = {
-        # Google Maps removed from available providers
-        'openstreetmap': {
-            'name': 'OpenStreetMap Overpass API',
-            'configured': True,  # Always available
-            'description': 'Free open-source business directory',
-            'cost': 'Completely Free'
-        },
-        'yellowpages': {
-            'name': 'Yellow Pages API',
-            'configured': True,  # Hosted API, no key required
-            'description': 'US business directory via hosted API',
-            'cost': 'Free'
-        }
-    }
-    return jsonify(providers)
+    return static_json_response(_AVAILABLE_PROVIDERS_JSON)
 
 
 @app.route('/api/enrich-leads', methods=['POST'])
@@ -2101,11 +2397,11 @@ def enrich_leads():
 def get_instantly_campaigns():
     """Get Instantly campaigns"""
     try:
-        api_key = os.getenv('INSTANTLY_API_KEY')
+        api_key = INSTANTLY_API_KEY
         if not api_key:
             return jsonify({'error': 'Instantly API key not configured'}), 400
             
-        instantly = InstantlyIntegration(api_key)
+        instantly = get_instantly()
         try:
             campaigns = instantly.get_campaigns()
             return jsonify(campaigns)
@@ -2128,14 +2424,14 @@ def create_instantly_campaign():
         campaign_name = data.get('campaign_name', f"Campaign {datetime.now().strftime('%Y%m%d_%H%M%S')}")
         template_type = data.get('template_type', 'generic')
         
-        api_key = os.getenv('INSTANTLY_API_KEY')
+        api_key = INSTANTLY_API_KEY
         if not api_key:
             return jsonify({'error': 'Instantly API key not configured'}), 400
             
         if not leads:
             return jsonify({'error': 'No leads provided'}), 400
             
-        instantly = InstantlyIntegration(api_key)
+        instantly = get_instantly()
         result = create_campaign_from_r27_leads(
             instantly, leads, campaign_name, template_type
         )
@@ -2159,8 +2455,9 @@ def configure_instantly_account():
         if not api_key:
             return jsonify({'error': 'API key is required'}), 400
         
-        # Test the API key
-        instantly = InstantlyIntegration(api_key)
+        # Test the API key, reusing the shared client (and its open connections) if the key is unchanged
+        current = get_instantly()
+        instantly = current if current is not None and current.api_key == api_key else InstantlyIntegration(api_key)
         
         # Try to get account info to validate the key
         try:
@@ -2169,7 +2466,8 @@ def configure_instantly_account():
             
             # Save the API key to environment (temporarily for this session)
             # In production, you'd want to save this securely to a database
-            os.environ['INSTANTLY_API_KEY'] = api_key
+            set_instantly_api_key(api_key)
+            adopt_instantly_client(instantly)
             
             return jsonify({
                 'success': True,
@@ -2192,7 +2490,7 @@ def configure_instantly_account():
 def get_instantly_status():
     """Check current Instantly connection status"""
     try:
-        api_key = os.getenv('INSTANTLY_API_KEY')
+        api_key = INSTANTLY_API_KEY
         if not api_key or api_key == 'your_instantly_api_key_here':
             return jsonify({
                 'success': False,
@@ -2200,7 +2498,7 @@ def get_instantly_status():
             })
         
         # Test the connection
-        instantly = InstantlyIntegration(api_key)
+        instantly = get_instantly()
         try:
             accounts = instantly.get_accounts()
             campaigns = instantly.get_campaigns()
@@ -2222,36 +2520,55 @@ def get_instantly_status():
         logger.error(f"Failed to check Instantly status: {e}")
         return jsonify({'error': str(e)}), 500
 
+CAMPAIGN_TEMPLATES = {
+    'real_estate': {
+        'name': 'Real Estate Outreach',
+        'description': 'Template for real estate professionals',
+        'emails': 3,
+        'follow_up_days': [3, 5, 7]
+    },
+    'lawyer': {
+        'name': 'Legal Services Outreach', 
+        'description': 'Template for law firms and legal services',
+        'emails': 3,
+        'follow_up_days': [4, 6, 8]
+    },
+    'restaurant': {
+        'name': 'Restaurant Outreach',
+        'description': 'Template for restaurants and hospitality',
+        'emails': 3,
+        'follow_up_days': [2, 4, 6]
+    },
+    'generic': {
+        'name': 'Generic B2B Outreach',
+        'description': 'General business-to-business template',
+        'emails': 3,
+        'follow_up_days': [3, 5, 7]
+    }
+}
+_CAMPAIGN_TEMPLATES_JSON = dumps_json(CAMPAIGN_TEMPLATES)
+
 @app.route('/api/instantly/templates', methods=['GET'])
 def get_campaign_templates():
     """Get available campaign templates"""
-    templates = {
-        'real_estate': {
-            'name': 'Real Estate Outreach',
-            'description': 'Template for real estate professionals',
-            'emails': 3,
-            'follow_up_days': [3, 5, 7]
-        },
-        'lawyer': {
-            'name': 'Legal Services Outreach', 
-            'description': 'Template for law firms and legal services',
-            'emails': 3,
-            'follow_up_days': [4, 6, 8]
-        },
-        'restaurant': {
-            'name': 'Restaurant Outreach',
-            'description': 'Template for restaurants and hospitality',
-            'emails': 3,
-            'follow_up_days': [2, 4, 6]
-        },
-        'generic': {
-            'name': 'Generic B2B Outreach',
-            'description': 'General business-to-business template',
-            'emails': 3,
-            'follow_up_days': [3, 5, 7]
-        }
-    }
-    return jsonify(templates)
+    return static_json_response(_CAMPAIGN_TEMPLATES_JSON)
+
+# Direct search providers for /api/multi-provider-search, built once and shared across requests
+SEARCH_PROVIDER_CLASSES = {
+    'openstreetmap': OpenStreetMapProvider,
+    'yellowpages': YellowPagesAPIProvider,
+}
+_search_providers = {}
+_search_providers_lock = threading.Lock()
+# Long-lived pool for the provider fan-out, so requests don't pay thread start-up each time
+SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=4 * len(SEARCH_PROVIDER_CLASSES), thread_name_prefix='search')
+
+def get_search_provider(name):
+    """Return the shared instance of a direct search provider"""
+    with _search_providers_lock:
+        if name not in _search_providers:
+            _search_providers[name] = SEARCH_PROVIDER_CLASSES[name]()
+        return _search_providers[name]
 
 @app.route('/api/multi-provider-search', methods=['POST'])
 def multi_provider_search():
@@ -2266,62 +2583,54 @@ def multi_provider_search():
         if not query:
             return jsonify({'error': 'Query required'}), 400
             
-        all_results = []
         provider_results = {}
+        total_results = 0
+        
+        # Deduplicate by name and address as each provider's results arrive
+        # (phone/email might not be available), without buffering every raw row first
+        seen = {}
+        unique_results = []
+        
+        def add_unique(results):
+            for result in results:
+                # Skip if no name
+                name = result.get('name', '').lower().strip()
+                if not name or name == 'unknown business':
+                    continue
+                
+                # Key on name + first 50 chars of address; setdefault does the
+                # membership test and insert in a single hash lookup
+                key = (name, result.get('address', '').lower().strip()[:50])
+                if seen.setdefault(key, result) is result:
+                    unique_results.append(result)
         
         # Google Maps removed - OpenStreetMap is primary provider
+        provider_labels = {'openstreetmap': 'OpenStreetMap', 'yellowpages': 'Yellow Pages'}
+        selected = [name for name in SEARCH_PROVIDER_CLASSES if name in providers]
         
-        # OpenStreetMap
-        if 'openstreetmap' in providers:
-            try:
-                osm_provider = OpenStreetMapProvider()
-                osm_results = osm_provider.search_businesses(query, location, limit)
-                provider_results['openstreetmap'] = {
-                    'count': len(osm_results),
-                    'results': osm_results
-                }
-                all_results.extend(osm_results)
-            except Exception as e:
-                logger.error(f"OpenStreetMap provider error: {e}")
-                provider_results['openstreetmap'] = {'error': str(e), 'count': 0}
+        def search(name):
+            return get_search_provider(name).search_businesses(query, location, limit)
+        
+        # Query the selected providers concurrently - each call is an independent HTTP round-trip
+        futures = {name: SEARCH_EXECUTOR.submit(search, name) for name in selected}
         
-        # Yellow Pages
-        if 'yellowpages' in providers:
+        # Merge in provider order so deduplication stays deterministic
+        for name in selected:
             try:
-                yp_provider = YellowPagesAPIProvider()
-                yp_results = yp_provider.search_businesses(query, location, limit)
-                provider_results['yellowpages'] = {
-                    'count': len(yp_results),
-                    'results': yp_results
+                results = futures[name].result()
+                provider_results[name] = {
+                    'count': len(results),
+                    'results': results
                 }
-                all_results.extend(yp_results)
+                total_results += len(results)
+                add_unique(results)
             except Exception as e:
-                logger.error(f"Yellow Pages provider error: {e}")
-                provider_results['yellowpages'] = {'error': str(e), 'count': 0}
-        
-        # Deduplicate by name and address (phone/email might not be available)
-        seen = set()
-        unique_results = []
-        for result in all_results:
-            # Create a more robust deduplication key
-            name = result.get('name', '').lower().strip()
-            address = result.get('address', '').lower().strip()
-            phone = result.get('phone', '').strip()
-            
-            # Skip if no name
-            if not name or name == 'unknown business':
-                continue
-            
-            # Create deduplication key
-            key = (name, address[:50] if address else '')  # First 50 chars of address
-            
-            if key not in seen:
-                seen.add(key)
-                unique_results.append(result)
+                logger.error(f"{provider_labels[name]} provider error: {e}")
+                provider_results[name] = {'error': str(e), 'count': 0}
         
         return jsonify({
             'success': True,
-            'total_results': len(all_results),
+            'total_results': total_results,
             'unique_results': len(unique_results),
             'provider_breakdown': provider_results,
             'results': unique_results
@@ -2337,27 +2646,36 @@ def test_provider():
     try:
         logger.info("Testing provider configuration...")
         # Test the MultiProvider directly
-        provider = get_provider('auto')
+        provider = cached_provider('auto')
         
         cascade_status = []
         if hasattr(provider, 'providers'):
-            for p_name, p_instance in provider.providers:
+            def probe(p_name, p_instance):
                 p_status = {'name': p_name, 'api_key_configured': False, 'test_fetch_worked': False, 'error': None}
                 
                 if hasattr(p_instance, 'api_key'):
                     p_status['api_key_configured'] = bool(p_instance.api_key)
                 
                 try:
-                    test_results = p_instance.fetch_places("coffee shop Austin", 1)
+                    test_results = cached_probe(p_instance)
                     p_status['test_fetch_worked'] = len(test_results) > 0
                 except Exception as e:
                     p_status['error'] = str(e)
-                cascade_status.append(p_status)
+                return p_status
+            
+            # Probe the cascade concurrently
+            futures = [PROBE_EXECUTOR.submit(probe, p_name, p_instance) for p_name, p_instance in provider.providers]
+            for (p_name, _), future in zip(provider.providers, futures):
+                try:
+                    cascade_status.append(future.result(timeout=PROBE_TIMEOUT))
+                except FuturesTimeoutError:
+                    cascade_status.append({'name': p_name, 'api_key_configured': False, 'test_fetch_worked': False,
+                                           'error': f'Probe timed out after {PROBE_TIMEOUT}s'})
             
         # Overall test for the main provider
         overall_test_results = []
         try:
-            overall_test_results = provider.fetch_places("coffee shop Austin", 1)
+            overall_test_results = cached_probe(provider)
             overall_test_worked = len(overall_test_results) > 0
         except:
             overall_test_worked = False
@@ -2366,9 +2684,9 @@ def test_provider():
             'status': 'healthy',
             'main_provider': provider.__class__.__name__,
             'main_provider_test_worked': overall_test_worked,
-            'google_api_key': bool(os.getenv('GOOGLE_API_KEY')),
-            'google_api_key_value': os.getenv('GOOGLE_API_KEY', '')[:10] + '...' if os.getenv('GOOGLE_API_KEY') else 'None',
-            'openai_configured': bool(os.getenv('OPENAI_API_KEY')),
+            'google_api_key': bool(GOOGLE_API_KEY),
+            'google_api_key_value': masked(GOOGLE_API_KEY),
+            'openai_configured': bool(OPENAI_API_KEY),
             'available_industries': IndustryConfig.get_industry_display_names(),
             'multi_provider_cascade_status': cascade_status if cascade_status else 'N/A'
         }
@@ -2414,51 +2732,68 @@ def retry_instantly_import():
     if not job_info:
         return jsonify({'error': 'Job not found'}), 404
 
+    # Nothing to send - no need to touch the result file
+    if job_info.get('verified_count') == 0:
+        return jsonify({'success': False, 'message': 'No verified emails in job'})
+
     # Read CSV and convert to Instantly leads
     try:
         result_file = job_info.get('result_file')
-        if not result_file or not os.path.exists(result_file):
+        st = stat_or_none(result_file)
+        if st is None:
             return jsonify({'error': 'Result file missing on disk'}), 404
 
-        # Preserve literal 'NA' strings so they don't become NaN in JSON payloads
-        df = pd.read_csv(result_file, keep_default_na=False)
-        leads = df.to_dict(orient='records')
-
-        # Filter to verified emails only if verification columns exist
-        filtered = []
-        for l in leads:
-            email = str(l.get('Email', '')).strip()
-            if not email or email == 'NA':
-                continue
-            status = str(l.get('Email_Status', '')).lower()
-            verified_flag = str(l.get('Email_Verified', '')).lower()
-            if status == 'valid' or verified_flag in ('true', '1', 'yes'):
-                filtered.append(l)
-        instantly_leads = convert_r27_leads_to_instantly(filtered)
+        # Verified emails only, converted to Instantly leads
+        instantly_leads = list(converted_leads_for(result_file, st))
 
-        api_key = os.getenv('INSTANTLY_API_KEY')
+        api_key = INSTANTLY_API_KEY
         if not api_key:
             return jsonify({'error': 'INSTANTLY_API_KEY not configured'}), 400
 
-        inst = InstantlyIntegration(api_key)
+        inst = get_instantly()
         result = inst.add_leads_to_campaign(campaign_id, instantly_leads)
         return jsonify(result)
     except Exception as e:
         logger.error(f"Retry Instantly import failed: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
-# Alias routes to avoid path mismatch issues
-@app.route('/api/instantly/import', methods=['POST'])
-def instantly_import_alias():
-    return retry_instantly_import()
+# Alias routes to avoid path mismatch issues - all dispatch straight to retry_instantly_import
+INSTANTLY_IMPORT_ALIASES = (
+    '/api/instantly/import',
+    '/api/instantly/retry_import',
+    '/api/instantly/add-leads',
+)
+for _path in INSTANTLY_IMPORT_ALIASES:
+    app.add_url_rule(_path, view_func=retry_instantly_import, methods=['POST'])
 
-@app.route('/api/instantly/retry_import', methods=['POST'])
-def instantly_retry_import_alias():
-    return retry_instantly_import()
+# Default cap on verified leads taken from any one job in a batch import
+BATCH_IMPORT_PER_JOB_LIMIT = 50000
 
-@app.route('/api/instantly/add-leads', methods=['POST'])
-def instantly_add_leads_alias():
-    return retry_instantly_import()
+def _load_filtered_leads(job_id, completed, per_job_limit=None):
+    """Converted verified leads from one job's result file (empty if the job or file is missing)"""
+    if job_id in jobs:
+        job_info = jobs[job_id].to_dict()
+    else:
+        job_info = completed.get(job_id)
+
+    if not job_info:
+        logger.warning(f"Job not found for batch import: {job_id}")
+        return []
+
+    if job_info.get('verified_count') == 0:
+        return []
+
+    result_file = job_info.get('result_file')
+    st = stat_or_none(result_file)
+    if st is None:
+        logger.warning(f"Result file missing for job {job_id}")
+        return []
+
+    # Read CSV, keeping only verified leads, up to the per-job cap
+    leads = converted_leads_for(result_file, st, per_job_limit)
+    if per_job_limit is not None and len(leads) >= per_job_limit:
+        logger.warning(f"Job {job_id} reached the per-job limit of {per_job_limit} leads; remaining rows were not read")
+    return leads
 
 @app.route('/api/instantly/retry-import-batch', methods=['POST'])
 def retry_instantly_import_batch():
@@ -2467,54 +2802,32 @@ def retry_instantly_import_batch():
     campaign_id = data.get('campaign_id')
     if not job_ids or not campaign_id:
         return jsonify({'error': 'job_ids (array) and campaign_id are required'}), 400
+    try:
+        per_job_limit = int(data.get('per_job_limit') or BATCH_IMPORT_PER_JOB_LIMIT)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'per_job_limit must be an integer'}), 400
+    if per_job_limit < 1:
+        return jsonify({'error': 'per_job_limit must be positive'}), 400
 
     try:
-        api_key = os.getenv('INSTANTLY_API_KEY')
+        api_key = INSTANTLY_API_KEY
         if not api_key:
             return jsonify({'error': 'INSTANTLY_API_KEY not configured'}), 400
 
-        # Collect leads from all jobs
-        all_leads = []
-        for job_id in job_ids:
-            # Load job info
-            job_info = None
-            if job_id in jobs:
-                job_info = jobs[job_id].to_dict()
-            else:
-                completed = load_completed_jobs()
-                job_info = completed.get(job_id)
-
-            if not job_info:
-                logger.warning(f"Job not found for batch import: {job_id}")
-                continue
-
-            result_file = job_info.get('result_file')
-            if not result_file or not os.path.exists(result_file):
-                logger.warning(f"Result file missing for job {job_id}")
-                continue
-
-            # Read CSV and convert
-            # Preserve literal 'NA' strings so they don't become NaN in JSON payloads
-            df = pd.read_csv(result_file, keep_default_na=False)
-            records = df.to_dict(orient='records')
-            filtered = []
-            for r in records:
-                email = str(r.get('Email', '')).strip()
-                if not email or email == 'NA':
-                    continue
-                status = str(r.get('Email_Status', '')).lower()
-                verified_flag = str(r.get('Email_Verified', '')).lower()
-                if status == 'valid' or verified_flag in ('true', '1', 'yes'):
-                    filtered.append(r)
-            all_leads.extend(filtered)
+        # Collect leads from all jobs, reading the result files concurrently
+        # (the pandas parser releases the GIL while it works)
+        completed = load_completed_jobs()
+        with ThreadPoolExecutor(max_workers=min(8, len(job_ids))) as executor:
+            per_job = list(executor.map(lambda job_id: _load_filtered_leads(job_id, completed, per_job_limit), job_ids))
+        instantly_leads = list(chain.from_iterable(per_job))
 
-        if not all_leads:
+        if not instantly_leads:
             return jsonify({'success': False, 'message': 'No valid leads with emails found across selected jobs'})
 
-        inst = InstantlyIntegration(api_key)
-        instantly_leads = convert_r27_leads_to_instantly(all_leads)
-        result = inst.add_leads_to_campaign(campaign_id, instantly_leads)
-        return jsonify({'success': True, **result, 'jobs_processed': len(job_ids)})
+        # Independent slices, so one failure or rate-limit stall doesn't sink the whole batch
+        inst = get_instantly()
+        result = inst.add_leads_in_slices(campaign_id, instantly_leads)
+        return jsonify({**result, 'jobs_processed': len(job_ids)})
     except Exception as e:
         logger.error(f"Batch Instantly import failed: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
@@ -2528,50 +2841,65 @@ def download_batch():
         return jsonify({'error': 'job_ids (array) is required'}), 400
 
     try:
-        # Create a temporary zip file
-        tmp_dir = tempfile.mkdtemp()
-        zip_path = os.path.join(tmp_dir, f"leads_batch_{int(time.time())}.zip")
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for job_id in job_ids:
-                job_info = None
-                if job_id in jobs:
-                    job_info = jobs[job_id].to_dict()
-                else:
-                    completed = load_completed_jobs()
-                    job_info = completed.get(job_id)
-
-                if not job_info:
-                    continue
+        # Resolve the files up front; the archive itself is built as it is sent
+        entries = []
+        completed = load_completed_jobs()
+        for job_id in job_ids:
+            if job_id in jobs:
+                job_info = jobs[job_id].to_dict()
+            else:
+                job_info = completed.get(job_id)
 
-                result_file = job_info.get('result_file')
-                if result_file and os.path.exists(result_file):
-                    # Add to zip with a friendly name
-                    base_name = os.path.basename(result_file)
-                    zf.write(result_file, arcname=base_name)
+            if not job_info:
+                continue
 
-        return send_file(zip_path, as_attachment=True, download_name=os.path.basename(zip_path), mimetype='application/zip')
+            result_file = job_info.get('result_file')
+            st = stat_or_none(result_file)
+            if st is not None:
+                # Add to zip with a friendly name
+                entries.append((result_file, os.path.basename(result_file), st))
+
+        download_name = f"leads_batch_{int(time.time())}.zip"
+        return Response(stream_zip(entries), mimetype='application/zip',
+                        headers={'Content-Disposition': f'attachment; filename={download_name}'})
     except Exception as e:
         logger.error(f"Batch download failed: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
+@functools.lru_cache(maxsize=None)
+def _routes():
+    """Sorted route list; routes are fixed once the app is set up (clear this if that changes)"""
+    return sorted(str(r) for r in app.url_map.iter_rules())
+
 @app.route('/api/routes')
 def list_routes():
-    return jsonify(sorted(str(r) for r in app.url_map.iter_rules()))
+    return jsonify(_routes())
 
 # Trailing-slash variants for Instantly import endpoints
-app.add_url_rule('/api/instantly/retry-import/', view_func=retry_instantly_import, methods=['POST'])
-app.add_url_rule('/api/instantly/import/', view_func=instantly_import_alias, methods=['POST'])
-app.add_url_rule('/api/instantly/retry_import/', view_func=instantly_retry_import_alias, methods=['POST'])
-app.add_url_rule('/api/instantly/add-leads/', view_func=instantly_add_leads_alias, methods=['POST'])
+for _path in ('/api/instantly/retry-import',) + INSTANTLY_IMPORT_ALIASES:
+    app.add_url_rule(_path + '/', view_func=retry_instantly_import, methods=['POST'])
+
 
 
+# Written while the dev server runs; read by the Windows start scripts
+SERVER_PID_FILE = '.server.pid'
+
+# Dev server port; tests/server_helpers.py reads the same variable
+SERVER_PORT = int(os.getenv('FLASK_RUN_PORT', '5001'))
 
 if __name__ == '__main__':
     print("\n" + "="*50)
     print("UPDATED - R27 Infinite AI Leads Agent - SCORING REMOVED")
     print("="*50)
-    print("\nStarting server at: http://localhost:5001")
+    print(f"\nStarting server at: http://localhost:{SERVER_PORT}")
     print("\nPress Ctrl+C to stop")
     print("="*50 + "\n")
     
-    app.run(debug=False, port=5001)
\ No newline at end of file
+    # Record our PID so start scripts can stop exactly this server instead of every python.exe
+    with open(SERVER_PID_FILE, 'w') as f:
+        f.write(str(os.getpid()))
+    try:
+        app.run(debug=False, port=SERVER_PORT)
+    finally:
+        if os.path.exists(SERVER_PID_FILE):
+            os.remove(SERVER_PID_FILE)
\ No newline at end of file
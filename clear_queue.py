@@ -20,12 +20,14 @@ print(f"  - {len([i for i in queue_items if i['status'] == 'completed'])} comple
 # Clear pending items
 if pending:
     print(f"\nClearing {len(pending)} pending items...")
-    for item in pending:
-        response = requests.delete(f'http://localhost:5000/api/queue/{item["id"]}')
-        if response.status_code == 200:
+    # One batched request - the server removes them all with a single DELETE ... WHERE id IN (...)
+    response = requests.post('http://localhost:5000/api/queue/bulk-delete',
+                             json={'queue_ids': [item['id'] for item in pending]})
+    if response.status_code == 200:
+        for item in pending:
             print(f"  Deleted queue item {item['id']}: {item['query']}")
-        else:
-            print(f"  Failed to delete item {item['id']}")
+    else:
+        print(f"  Failed to delete pending items (HTTP {response.status_code})")
 
 print("\nDone! Remaining queue items are either processing or completed.")
 print("\nNote: The currently processing item will complete on its own.")
\ No newline at end of file
@@ -0,0 +1,16 @@
+"""
+Shared pytest fixtures for the live-server test scripts.
+
+The server helpers live in tests/server_helpers.py so scripts can import them too.
+"""
+
+import pytest
+
+from tests.server_helpers import running_server
+
+
+@pytest.fixture(scope='session')
+def flask_server():
+    """One Flask server shared by every test in the session"""
+    with running_server() as base_url:
+        yield base_url
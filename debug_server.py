@@ -9,6 +9,8 @@ import os
 import time
 import threading
 
+from src.utils import tail_lines
+
 app = Flask(__name__)
 CORS(app)
 
@@ -19,10 +21,9 @@ def get_logs():
     try:
         log_file = 'logs/flask_app.log'
         if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                lines = f.readlines()[-100:]  # Get last 100 lines
-                for line in lines:
-                    recent_logs.append(line.strip())
+            # Get last 100 lines, reading only the end of the file
+            for line in tail_lines(log_file, 100):
+                recent_logs.append(line.strip())
         else:
             recent_logs = ["Log file not found - app may not be running"]
     except Exception as e:
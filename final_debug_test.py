@@ -3,29 +3,18 @@
 import requests
 import json
 import time
-import subprocess
-import signal
-import os
-from threading import Thread
 
-def run_server():
-    """Run the Flask server"""
-    env = os.environ.copy()
-    env['PYTHONUNBUFFERED'] = '1'  # Force unbuffered output
-    subprocess.run(['python', 'app.py'], env=env)
+import pytest
 
+from tests.server_helpers import BASE_URL, running_server
+
+@pytest.mark.usefixtures('flask_server')
 def test_multi_query():
     """Test multi-query functionality"""
     
     print("🚀 FINAL DEBUG TEST")
     print("="*50)
     
-    # Start server in background
-    print("📡 Starting Flask server...")
-    server_thread = Thread(target=run_server, daemon=True)
-    server_thread.start()
-    time.sleep(6)  # Wait for server to fully start
-    
     # Test payload
     payload = {
         "query": "lawyers in Las Vegas | attorneys in Las Vegas",
@@ -41,7 +30,7 @@ def test_multi_query():
     print(f"    Expected result: Up to {len(payload['queries']) * payload['limit']} total leads")
     
     try:
-        response = requests.post('http://localhost:5000/api/generate', json=payload)
+        response = requests.post(f'{BASE_URL}/api/generate', json=payload)
         
         if response.status_code == 200:
             job_id = response.json()['job_id']
@@ -50,7 +39,7 @@ def test_multi_query():
             # Monitor job
             for i in range(20):  # 40 seconds max
                 time.sleep(2)
-                status_response = requests.get(f'http://localhost:5000/api/status/{job_id}')
+                status_response = requests.get(f'{BASE_URL}/api/status/{job_id}')
                 
                 if status_response.status_code == 200:
                     status = status_response.json()
@@ -88,5 +77,7 @@ def test_multi_query():
     print("🏁 FINAL DEBUG TEST COMPLETE")
 
 if __name__ == "__main__":
-    test_multi_query()
+    print("📡 Starting Flask server...")
+    with running_server():
+        test_multi_query()
 
@@ -6,19 +6,15 @@ Final test of email generation toggle - no hanging commands
 import requests
 import json
 import time
-import subprocess
-import signal
-import os
 
-def start_flask():
-    """Start Flask server"""
-    return subprocess.Popen(['python', 'app.py'], 
-                          stdout=subprocess.DEVNULL, 
-                          stderr=subprocess.DEVNULL)
+import pytest
 
+from tests.server_helpers import BASE_URL, running_server
+
+@pytest.mark.usefixtures('flask_server')
 def test_toggle():
     """Test the toggle functionality"""
-    base_url = "http://localhost:5000"
+    base_url = BASE_URL
     
     # Test with emails DISABLED
     print("Testing email generation DISABLED...")
@@ -62,17 +58,10 @@ def test_toggle():
     return False
 
 if __name__ == "__main__":
-    # Start Flask
-    flask_proc = start_flask()
-    time.sleep(3)  # Wait for startup
-    
-    try:
+    # Start Flask (or reuse a running server) and stop it afterwards
+    with running_server():
         success = test_toggle()
         if success:
             print("\n🎉 EMAIL GENERATION TOGGLE WORKING!")
         else:
             print("\n❌ Toggle not working properly")
-    finally:
-        # Clean shutdown
-        flask_proc.terminate()
-        flask_proc.wait(timeout=5)
@@ -9,33 +9,66 @@ Addresses:
 """
 
 import os
+import re
 import sys
+import hashlib
+import functools
 import subprocess
 import time
 import shutil
 from pathlib import Path
 
-def clear_browser_cache_hints():
-    """Add cache-busting parameters to all static resources"""
+TEMPLATE_PATH = Path("templates/index.html")
+STATIC_DIR = Path("static")
+
+# Directories clear_flask_cache never walks into; a virtualenv alone can hold tens of thousands of files
+PYC_WALK_SKIP_DIRS = frozenset({'.git', 'node_modules', '.venv', 'venv', '.tox', '.mypy_cache'})
+
+_CACHE_BUSTER_RE = re.compile(r'<!-- Cache buster: \d+ -->')
+_STATIC_HREF_RE = re.compile(r'(href|src)="(/static/[^"]+)"')
+
+def _load_template():
+    """Read index.html once for all the template fixers (None if it's missing)"""
+    if not TEMPLATE_PATH.exists():
+        return None
+    return TEMPLATE_PATH.read_text(encoding='utf-8')
+
+def _save_template(content):
+    TEMPLATE_PATH.write_text(content, encoding='utf-8')
+
+@functools.lru_cache(maxsize=None)
+def _asset_hash(path, mtime_ns):
+    """Short content hash of a static file; mtime_ns keys out stale entries"""
+    return hashlib.md5(Path(path).read_bytes()).hexdigest()[:8]
+
+def clear_browser_cache_hints(content):
+    """Version static resource URLs by content hash so only changed files get re-downloaded"""
     print("Adding cache-busting to HTML templates...")
     
-    template_path = Path("templates/index.html")
-    if template_path.exists():
-        content = template_path.read_text(encoding='utf-8')
-        
-        # Add timestamp to all static resource URLs
-        timestamp = str(int(time.time()))
-        
-        # Replace any existing cache buster comments
-        import re
-        content = re.sub(r'<!-- Cache buster: \d+ -->', f'<!-- Cache buster: {timestamp} -->', content)
-        
-        # Add version params to local resources if not present
-        if '?v=' not in content:
-            content = re.sub(r'(href|src)="(/static/[^"]+)"', rf'\1="\2?v={timestamp}"', content)
-        
-        template_path.write_text(content, encoding='utf-8')
-        print(f"[OK] Updated cache buster to: {timestamp}")
+    if content is None:
+        return content
+    
+    # Files that can't be found on disk fall back to a timestamp
+    timestamp = str(int(time.time()))
+    
+    def bust(match):
+        url = match.group(2).split('?', 1)[0]
+        asset = STATIC_DIR / url[len('/static/'):]
+        try:
+            version = _asset_hash(str(asset), asset.stat().st_mtime_ns)
+        except OSError:
+            version = timestamp
+        return f'{match.group(1)}="{url}?v={version}"'
+    
+    busted = _STATIC_HREF_RE.sub(bust, content)
+    if busted == content:
+        print("[OK] Static resources unchanged, cache buster left as is")
+        return content
+    
+    # Replace any existing cache buster comments
+    content = _CACHE_BUSTER_RE.sub(f'<!-- Cache buster: {timestamp} -->', busted)
+    print(f"[OK] Updated cache buster to: {timestamp}")
+    return content
 
 def fix_csv_headers():
     """Ensure CSV upload accepts both old and new header formats"""
@@ -103,27 +136,18 @@ def fix_csv_headers():
         print("[WARNING] Manual review needed for bulk_upload_schedules function")
         print("  Recommendation: Add flexible header support")
 
-def fix_positioning():
+def fix_positioning(content):
     """Fix section positioning on scheduling page"""
     print("\nFixing scheduling page positioning...")
     
-    template_path = Path("templates/index.html")
-    if not template_path.exists():
+    if content is None:
         print("[ERROR] index.html not found!")
-        return
-    
-    content = template_path.read_text(encoding='utf-8')
+        return content
     
     # Ensure CSV upload section is properly positioned at top
     if 'BULK CSV UPLOAD' in content:
         print("[OK] Found CSV upload section")
         
-        # Check if it's within the scheduling tab content
-        import re
-        
-        # Find the scheduling tab content div
-        pattern = r'<div[^>]*id="schedulingTab"[^>]*>.*?</div>'
-        
         # Ensure proper structure
         if 'schedulingTab' in content:
             print("[OK] Scheduling tab structure found")
@@ -143,8 +167,9 @@ def fix_positioning():
                     print("[OK] Added positioning fixes to CSV upload section")
             
             if fixes_applied:
-                template_path.write_text(content, encoding='utf-8')
-                print("[OK] Saved positioning fixes")
+                print("[OK] Applied positioning fixes")
+    
+    return content
 
 def clear_flask_cache():
     """Clear Flask cache and restart with proper config"""
@@ -157,10 +182,19 @@ def clear_flask_cache():
             shutil.rmtree(cache_dir)
             print(f"[OK] Cleared {cache_dir}")
     
-    # Clear .pyc files
-    for pyc_file in Path('.').rglob('*.pyc'):
-        pyc_file.unlink()
-    print("[OK] Cleared all .pyc files")
+    # Clear .pyc files: drop whole __pycache__ directories instead of unlinking file by file
+    removed = 0
+    for root, dirnames, filenames in os.walk('.'):
+        if '__pycache__' in dirnames:
+            shutil.rmtree(os.path.join(root, '__pycache__'), ignore_errors=True)
+            removed += 1
+        # Prune in place: don't descend into what we just deleted, VCS metadata or environments
+        dirnames[:] = [d for d in dirnames if d != '__pycache__' and d not in PYC_WALK_SKIP_DIRS]
+        # Stray .pyc files left next to their sources by old tooling
+        for filename in filenames:
+            if filename.endswith('.pyc'):
+                os.unlink(os.path.join(root, filename))
+    print(f"[OK] Cleared all .pyc files ({removed} __pycache__ directories)")
 
 def add_aggressive_no_cache():
     """Add more aggressive no-cache headers to Flask"""
@@ -175,10 +209,10 @@ def add_aggressive_no_cache():
     # Check if we have the after_request handler
     if '@app.after_request' in content:
         print("[OK] Found after_request handler")
-        
-        # Make it more aggressive
-        if 'must-revalidate' not in content:
-            print("[WARNING] Consider updating cache headers to be more aggressive")
+    
+    # no-cache + no-store covers max-age=0/must-revalidate and makes Expires redundant
+    if "'no-cache, no-store'" not in content:
+        print("[WARNING] Consider setting Cache-Control: no-cache, no-store and Pragma: no-cache")
 
 def create_startup_script():
     """Create a startup script with proper environment setup"""
@@ -188,11 +222,14 @@ def create_startup_script():
 echo Starting R27 Infinite AI Leads Agent...
 echo.
 
-REM Kill any existing Python processes
+REM Stop the previous server by its PID file; other Python processes are left alone
 echo Cleaning up old processes...
-taskkill /F /IM python.exe 2>nul
-taskkill /F /IM python3.exe 2>nul
-taskkill /F /IM python3.12.exe 2>nul
+if exist .server.pid (
+    for /f %%p in (.server.pid) do taskkill /F /PID %%p /FI "IMAGENAME eq python*" 2>nul
+    del .server.pid 2>nul
+) else (
+    echo No .server.pid found, so no previous server to stop.
+)
 timeout /t 2 /nobreak >nul
 
 REM Clear Python cache
@@ -223,10 +260,13 @@ def main():
     print("SITE UPDATE ISSUES FIX SCRIPT")
     print("=" * 60)
     
-    # Run all fixes
-    clear_browser_cache_hints()
+    # Run all fixes; the template fixers share one read and one write of index.html
+    template = original_template = _load_template()
+    template = clear_browser_cache_hints(template)
     fix_csv_headers()
-    fix_positioning()
+    template = fix_positioning(template)
+    if template is not None and template != original_template:
+        _save_template(template)
     clear_flask_cache()
     add_aggressive_no_cache()
     create_startup_script()
@@ -3,74 +3,192 @@
 Script to process raw.csv and verified.csv spreadsheets:
 1. Keep only entries from raw.csv that have verified emails (status='ok' in verified.csv)
 2. Remove duplicates
-3. Output cleaned data
+3. Output cleaned data (raw_cleaned.parquet, or raw_cleaned.csv with LEGACY_CSV=1)
 """
 
 import pandas as pd
+import csv
 import sys
 import os
 
+# PyArrow's multi-threaded CSV reader is used when available
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Lines of export info above the header row in verified.csv
+VERIFIED_PREAMBLE_LINES = 4
+
+# Bytes PyArrow parses per block (and per thread); raw.csv is streamed one block at a time
+CSV_BLOCK_SIZE = 8 << 20
+
+# Rows per raw.csv chunk when streaming with pandas
+RAW_CHUNK_ROWS = 200_000
+
+# Quote only the fields that need it, like pandas' to_csv
+CSV_WRITE_OPTIONS = pacsv.WriteOptions(quoting_style='needed') if PYARROW_AVAILABLE else None
+
+# The cleaned output is snappy Parquet; set LEGACY_CSV=1 (or run without pyarrow) to get raw_cleaned.csv
+WRITE_PARQUET = PYARROW_AVAILABLE and not os.getenv('LEGACY_CSV')
+
+def read_csv_header(path, preamble_lines=0):
+    """Column names of a CSV, skipping `preamble_lines` lines before the header"""
+    with open(path, newline='', encoding='utf-8') as f:
+        for _ in range(preamble_lines):
+            f.readline()
+        return next(csv.reader(f), [])
+
+def read_csv_table(path, preamble_lines=0, columns=None):
+    """Read a CSV into a pyarrow Table, skipping `preamble_lines` lines before the header
+    
+    Only the named `columns` are parsed when given.
+    """
+    read_options = pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE, use_threads=True)
+    convert_options = pacsv.ConvertOptions(include_columns=columns) if columns else None
+    with open(path, 'rb') as f:
+        for _ in range(preamble_lines):
+            f.readline()
+        return pacsv.read_csv(f, read_options=read_options, convert_options=convert_options)
+
+def iter_cleaned_chunks(path, verified_emails, columns):
+    """Stream a raw CSV, yielding (rows read, first rows of not-yet-seen verified emails) per chunk
+    
+    Chunks are pyarrow RecordBatches when pyarrow is available, pandas DataFrames otherwise.
+    With pyarrow, only the chunk and the verified emails still unseen are held in memory;
+    with pandas, the email column is read first and only the kept rows are parsed in full.
+    """
+    if PYARROW_AVAILABLE:
+        # Every column as text: keeps values verbatim and types stable from block to block
+        convert_options = pacsv.ConvertOptions(column_types={col: pa.string() for col in columns})
+        read_options = pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE, use_threads=True)
+        remaining = verified_emails
+        for batch in pacsv.open_csv(path, read_options=read_options, convert_options=convert_options):
+            # index_in finds each unseen verified email's first row in the chunk
+            first_rows = pc.index_in(remaining, value_set=batch.column('email'))
+            found = pc.is_valid(first_rows)
+            rows = pc.filter(first_rows, found)
+            remaining = pc.filter(remaining, pc.invert(found))
+            yield batch.num_rows, batch.take(pc.take(rows, pc.array_sort_indices(rows)))
+    else:
+        # Pass 1: parse only the email column and pick the first row of each verified email
+        emails = pd.read_csv(path, usecols=['email'], dtype={'email': 'string'}, engine='c')['email']
+        keep_rows = set(emails.index[emails.isin(verified_emails) & ~emails.duplicated()].tolist())
+        rows_read = len(emails)
+        del emails
+        
+        # Pass 2: every column as text (no per-chunk type inference, so a column can't come out
+        # as int in one chunk and float in the next); rows that aren't kept are skipped by the
+        # tokenizer before any cell becomes a Python object. Line 0 is the header.
+        chunks = pd.read_csv(path, chunksize=RAW_CHUNK_ROWS, dtype={col: 'string' for col in columns}, engine='c',
+                             skiprows=lambda line: line > 0 and line - 1 not in keep_rows)
+        for chunk in chunks:
+            yield rows_read, chunk
+            rows_read = 0
+        if rows_read:
+            yield rows_read, pd.DataFrame(columns=columns)
+
+def open_cleaned_writer(path, schema):
+    """Arrow writer for the cleaned output: snappy Parquet, or CSV with LEGACY_CSV=1"""
+    if WRITE_PARQUET:
+        return pq.ParquetWriter(path, schema, compression='snappy')
+    return pacsv.CSVWriter(path, schema, write_options=CSV_WRITE_OPTIONS)
+
 def process_spreadsheets():
     """Process the raw and verified spreadsheets"""
     
     print("Loading spreadsheets...")
     
-    # Load the raw CSV
+    # Load the verified CSV; only email (index 0) and status (index 4) are parsed
     try:
-        raw_df = pd.read_csv('raw.csv')
-        print(f"✅ Loaded raw.csv: {len(raw_df)} entries")
+        verified_columns = read_csv_header('verified.csv', VERIFIED_PREAMBLE_LINES)  # Skip the header info
+        if len(verified_columns) >= 5:
+            email_col, status_col = verified_columns[0], verified_columns[4]
+            if PYARROW_AVAILABLE:
+                verified_table = read_csv_table('verified.csv', VERIFIED_PREAMBLE_LINES,
+                                                columns=[email_col, status_col])
+            else:
+                # category status makes the == 'ok' check an integer compare per row
+                verified_table = pd.read_csv('verified.csv', skiprows=VERIFIED_PREAMBLE_LINES, usecols=[0, 4],
+                                             dtype={email_col: 'string', status_col: 'category'})
+        else:
+            verified_table = ()
+        print(f"✅ Loaded verified.csv: {len(verified_table)} entries")
     except Exception as e:
-        print(f"❌ Error loading raw.csv: {e}")
+        print(f"❌ Error loading verified.csv: {e}")
         return
     
-    # Load the verified CSV
+    # raw.csv is streamed below; only its header is read up front
     try:
-        verified_df = pd.read_csv('verified.csv', skiprows=4)  # Skip the header info
-        print(f"✅ Loaded verified.csv: {len(verified_df)} entries")
+        raw_columns = read_csv_header('raw.csv')
     except Exception as e:
-        print(f"❌ Error loading verified.csv: {e}")
+        print(f"❌ Error loading raw.csv: {e}")
         return
     
     print("\nAnalyzing data structure...")
-    print("Raw CSV columns:", raw_df.columns.tolist())
-    print("Verified CSV columns:", verified_df.columns.tolist())
+    print("Raw CSV columns:", raw_columns)
+    print("Verified CSV columns:", verified_columns)
     
     # The verified CSV appears to have: email, name, domain, mx, status, result
-    # We need to extract emails with status='ok'
-    verified_emails = set()
-    
-    if len(verified_df.columns) >= 5:
+    # We need to extract emails with status='ok', kept as an array (not a Python set) for the lookup below
+    if len(verified_columns) >= 5:
         # Extract emails where status (column 5, index 4) is 'ok'
-        ok_emails = verified_df[verified_df.iloc[:, 4] == 'ok'].iloc[:, 0]
-        verified_emails = set(ok_emails.dropna())
+        if PYARROW_AVAILABLE:
+            is_ok = pc.equal(verified_table.column(status_col), 'ok')
+            verified_emails = pc.unique(pc.filter(verified_table.column(email_col), is_ok).drop_null())
+        else:
+            ok_emails = verified_table.loc[verified_table[status_col] == 'ok', email_col]
+            verified_emails = ok_emails.dropna().unique()
         print(f"✅ Found {len(verified_emails)} verified emails with 'ok' status")
     else:
         print("❌ Verified CSV doesn't have expected structure")
         return
     
-    print("\nFiltering raw data...")
-    # Filter raw data to keep only entries with verified emails
+    print("\nFiltering raw data and removing duplicates...")
+    # Keep the first raw row for each verified email, appending each chunk's rows to the output as it's read
     # Email is in column 'email' (index 3 based on the sample)
-    filtered_df = raw_df[raw_df['email'].isin(verified_emails)]
-    print(f"✅ Filtered to {len(filtered_df)} entries with verified emails")
-    
-    print("\nRemoving duplicates...")
-    # Remove duplicates based on email address
-    cleaned_df = filtered_df.drop_duplicates(subset=['email'], keep='first')
-    print(f"✅ After removing duplicates: {len(cleaned_df)} entries")
-    
-    # Save the cleaned data
-    output_file = 'raw_cleaned.csv'
-    cleaned_df.to_csv(output_file, index=False)
+    output_file = 'raw_cleaned.parquet' if WRITE_PARQUET else 'raw_cleaned.csv'
+    raw_count = cleaned_count = 0
+    sample = []
+    writer = None
+    try:
+        for rows_read, cleaned_chunk in iter_cleaned_chunks('raw.csv', verified_emails, raw_columns):
+            if PYARROW_AVAILABLE:
+                # Arrow's C++ writers take the batch directly, with no pandas conversion
+                if writer is None:
+                    writer = open_cleaned_writer(output_file, cleaned_chunk.schema)
+                writer.write_batch(cleaned_chunk)
+            else:
+                cleaned_chunk.to_csv(output_file, mode='a' if raw_count else 'w', header=not raw_count, index=False)
+            raw_count += rows_read
+            cleaned_count += len(cleaned_chunk)
+            if sum(map(len, sample)) < 5:
+                sample.append(cleaned_chunk.slice(0, 5).to_pandas() if PYARROW_AVAILABLE else cleaned_chunk.head())
+        if PYARROW_AVAILABLE and writer is None:
+            # raw.csv has a header but no rows, so no batch arrived; still write the empty output
+            writer = open_cleaned_writer(output_file, pa.schema([(col, pa.string()) for col in raw_columns]))
+    except Exception as e:
+        print(f"❌ Error processing raw.csv: {e}")
+        return
+    finally:
+        if writer is not None:
+            writer.close()
+    print(f"✅ Read raw.csv: {raw_count} entries")
+    print(f"✅ Kept {cleaned_count} unique entries with verified emails")
     print(f"✅ Saved cleaned data to {output_file}")
     
-    print(f"\nFinal count: {len(cleaned_df)} entries")
+    print(f"\nFinal count: {cleaned_count} entries")
     
     # Show sample of the cleaned data
-    print("\nSample of cleaned data:")
-    print(cleaned_df[['name', 'email', 'organization_name']].head())
+    if sample:
+        print("\nSample of cleaned data:")
+        print(pd.concat(sample)[['name', 'email', 'organization_name']].head())
     
-    return len(cleaned_df)
+    return cleaned_count
 
 if __name__ == "__main__":
     result = process_spreadsheets()
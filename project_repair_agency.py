@@ -7,6 +7,9 @@ import json
 import subprocess
 import ast
 import re
+import functools
+import importlib.util
+import shutil
 from pathlib import Path
 from agency_swarm import Agent, Agency, set_openai_key
 from agency_swarm.tools import BaseTool
@@ -14,6 +17,13 @@ from pydantic import Field
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
+# Hyperscan (optional) matches every performance pattern in one vectorized scan
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
 # Load environment variables
 load_dotenv()
 
@@ -22,6 +32,178 @@ set_openai_key(os.getenv("OPENAI_API_KEY"))
 
 # ==================== ANALYSIS & REPAIR TOOLS ====================
 
+# Patterns used by the tools below, compiled once at import
+
+# Hardcoded credential assignments
+_CRED_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'api_key\s*=\s*["\'][^"\']+["\']',
+    r'password\s*=\s*["\'][^"\']+["\']',
+    r'secret\s*=\s*["\'][^"\']+["\']',
+)]
+
+# String concatenation inside a SQL execute() call
+_SQL_CONCAT_RE = re.compile(r'execute\([^)]*\+[^)]*\)')
+
+# Top-level function definitions; group 2 is set when the body starts with a docstring
+_FUNC_DOCSTRING_RE = re.compile(r'^def\s+(\w+)\s*\([^)]*\):[^\n]*\n\s*(""")?', re.MULTILINE)
+
+# Risky calls FixCodeIssueTool wraps in try/except
+_ERROR_HANDLING_FIXES = [
+    (re.compile(r'(requests\.\w+\([^)]+\))'), r'try:\n    \1\nexcept Exception as e:\n    print(f"Error: {e}")\n    return None'),
+    (re.compile(r'(open\([^)]+\))'), r'try:\n    \1\nexcept IOError as e:\n    print(f"File error: {e}")\n    return None'),
+]
+
+# Function bodies, for RefactorCodeTool's length check
+_FUNC_BODY_RE = re.compile(r'def\s+(\w+)\s*\([^)]*\):[^}]+?(?=\ndef|\Z)', re.DOTALL)
+
+# Inefficient patterns OptimizePerformanceTool reports
+_PERFORMANCE_PATTERNS = [(re.compile(pattern), suggestion) for pattern, suggestion in (
+    (r'for .+ in range\(len\((.+)\)\):', "Use enumerate() instead of range(len())"),
+    (r'\.append\(.+\) for .+ in', "Consider using list comprehension"),
+    (r'time\.sleep\(', "Avoid blocking sleep in production code"),
+    (r'SELECT \* FROM', "Avoid SELECT *, specify columns explicitly"),
+    (r'except:\s*\n\s*pass', "Avoid bare except with pass"),
+    (r'global\s+\w+', "Avoid global variables, use class attributes or return values"),
+)]
+
+@functools.lru_cache(maxsize=1)
+def _performance_database():
+    """All _PERFORMANCE_PATTERNS compiled into one Hyperscan database (None if unavailable)"""
+    if not HYPERSCAN_AVAILABLE:
+        return None
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[pattern.pattern.encode() for pattern, _ in _PERFORMANCE_PATTERNS],
+            ids=list(range(len(_PERFORMANCE_PATTERNS))),
+            elements=len(_PERFORMANCE_PATTERNS),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(_PERFORMANCE_PATTERNS)
+        )
+        return database
+    except Exception:
+        return None
+
+def match_performance_patterns(content):
+    """The (pattern, suggestion) entries of _PERFORMANCE_PATTERNS found in content, in table order"""
+    database = _performance_database()
+    if database is None:
+        return [(pattern, suggestion) for pattern, suggestion in _PERFORMANCE_PATTERNS if pattern.search(content)]
+    
+    matched = set()
+    def on_match(pattern_id, start, end, flags, context):
+        matched.add(pattern_id)
+    database.scan(content.encode('utf-8'), match_event_handler=on_match)
+    return [entry for i, entry in enumerate(_PERFORMANCE_PATTERNS) if i in matched]
+
+def occurs_more_than(text, needle, times):
+    """Whether needle occurs more than `times` times in text; stops scanning at the first extra hit"""
+    index = -len(needle)
+    for _ in range(times + 1):
+        index = text.find(needle, index + len(needle))
+        if index == -1:
+            return False
+    return True
+
+@functools.lru_cache(maxsize=512)
+def _read_file(path, mtime_ns):
+    """Text of a source file; mtime_ns keys out stale entries"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def read_source(path):
+    """Read a file once for every tool that audits it, until it changes on disk"""
+    return _read_file(path, os.stat(path).st_mtime_ns)
+
+# Rules CodeAuditTool enables on top of Ruff's defaults: function docstrings and bare except.
+# Hardcoded credentials and string-built SQL are left to its own checks, which run either way
+RUFF_EXTRA_RULES = 'D103,E722'
+
+# (rule code prefix, issue type, severity) for Ruff findings; first match wins
+RUFF_ISSUE_TYPES = [
+    ('F401', 'unused_code', 'low'),
+    ('D', 'documentation', 'low'),
+    ('E722', 'error_handling', 'medium'),
+    ('S', 'security', 'critical'),
+    ('F', 'correctness', 'high'),
+]
+
+def ruff_issues(path):
+    """
+    Lint a file with Ruff and convert its findings to CodeAuditTool issues
+    
+    Returns None when the ruff executable isn't installed or can't lint the file.
+    """
+    ruff = shutil.which('ruff')
+    if not ruff:
+        return None
+    result = subprocess.run(
+        [ruff, 'check', '--output-format=json', '--extend-select', RUFF_EXTRA_RULES, '--no-cache', path],
+        capture_output=True,
+        text=True,
+        timeout=60
+    )
+    # 0: clean, 1: findings; anything else is a Ruff error
+    if result.returncode not in (0, 1):
+        return None
+    issues = []
+    for finding in json.loads(result.stdout or '[]'):
+        code = finding.get('code') or ''
+        issue_type, severity = next(((t, sev) for prefix, t, sev in RUFF_ISSUE_TYPES if code.startswith(prefix)),
+                                    ('lint', 'low'))
+        issues.append({
+            "type": issue_type,
+            "severity": severity,
+            "message": f"{code} line {finding['location']['row']}: {finding['message']}"
+        })
+    return issues
+
+class AuditVisitor(ast.NodeVisitor):
+    """
+    Collects everything the audit tools look at in one traversal of a parsed module:
+    imports, referenced names, function definitions and bare except clauses
+    """
+    
+    def __init__(self):
+        self.imports = []       # (Import/ImportFrom node, names it binds)
+        self.used_names = set()  # plain names and attribute names referenced anywhere
+        self.functions = []     # FunctionDef/AsyncFunctionDef nodes
+        self.bare_excepts = []  # line numbers of `except:` clauses
+    
+    @classmethod
+    def scan(cls, tree):
+        visitor = cls()
+        visitor.visit(tree)
+        return visitor
+    
+    def visit_Import(self, node):
+        self.imports.append((node, [alias.asname or alias.name.split('.')[0] for alias in node.names]))
+    
+    def visit_ImportFrom(self, node):
+        if node.module != '__future__':
+            self.imports.append((node, [alias.asname or alias.name for alias in node.names if alias.name != '*']))
+    
+    def visit_Name(self, node):
+        self.used_names.add(node.id)
+    
+    def visit_Attribute(self, node):
+        self.used_names.add(node.attr)
+        self.generic_visit(node)
+    
+    def visit_FunctionDef(self, node):
+        self.functions.append(node)
+        self.generic_visit(node)
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def visit_ExceptHandler(self, node):
+        if node.type is None:
+            self.bare_excepts.append(node.lineno)
+        self.generic_visit(node)
+    
+    def unused_imports(self):
+        """Import statements paired with the names they bind that are never referenced"""
+        return [(node, [name for name in names if name not in self.used_names]) for node, names in self.imports]
+
 class CodeAuditTool(BaseTool):
     """
     Audits code files to identify issues, bugs, and improvement opportunities.
@@ -36,8 +218,7 @@ class CodeAuditTool(BaseTool):
             if not os.path.exists(self.file_path):
                 return {"status": "error", "message": f"File not found: {self.file_path}"}
             
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = read_source(self.file_path)
             
             # Check for common Python issues
             if self.file_path.endswith('.py'):
@@ -50,49 +231,62 @@ class CodeAuditTool(BaseTool):
                     })
                 
                 # Check for hardcoded credentials
-                credential_patterns = [
-                    r'api_key\s*=\s*["\'][^"\']+["\']',
-                    r'password\s*=\s*["\'][^"\']+["\']',
-                    r'secret\s*=\s*["\'][^"\']+["\']'
-                ]
-                for pattern in credential_patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
+                for pattern in _CRED_PATTERNS:
+                    if pattern.search(content):
                         issues.append({
                             "type": "security",
                             "severity": "critical",
                             "message": "Possible hardcoded credentials detected"
                         })
                 
-                # Check for unused imports
-                import_lines = re.findall(r'^import\s+(\w+)|^from\s+[\w.]+\s+import\s+(\w+)', content, re.MULTILINE)
-                for imp in import_lines:
-                    module = imp[0] or imp[1]
-                    if module and content.count(module) == 1:  # Only appears in import
-                        issues.append({
-                            "type": "unused_code",
-                            "severity": "low",
-                            "message": f"Possibly unused import: {module}"
-                        })
-                
                 # Check for SQL injection vulnerabilities
                 if 'execute(' in content and '%s' not in content and '?' not in content:
-                    if re.search(r'execute\([^)]*\+[^)]*\)', content):
+                    if _SQL_CONCAT_RE.search(content):
                         issues.append({
                             "type": "security",
                             "severity": "critical",
                             "message": "Potential SQL injection vulnerability"
                         })
                 
-                # Check for missing docstrings
-                functions = re.findall(r'^def\s+(\w+)\s*\([^)]*\):', content, re.MULTILINE)
-                for func in functions:
-                    func_pattern = f'def {func}.*?:\\n\\s*"""'
-                    if not re.search(func_pattern, content, re.DOTALL):
+                # Lint with Ruff when it's installed; otherwise fall back to the built-in checks
+                linted = ruff_issues(self.file_path)
+                if linted is not None:
+                    issues.extend(linted)
+                else:
+                    try:
+                        audit = AuditVisitor.scan(ast.parse(content))
+                    except SyntaxError:
+                        audit = None
+                    
+                    # Check for unused imports (skipped if the file doesn't parse)
+                    for _, names in audit.unused_imports() if audit else []:
+                        for module in names:
+                            issues.append({
+                                "type": "unused_code",
+                                "severity": "low",
+                                "message": f"Possibly unused import: {module}"
+                            })
+                    
+                    # Check for missing docstrings on top-level functions
+                    if audit:
+                        undocumented = [func.name for func in audit.functions
+                                        if func.col_offset == 0 and ast.get_docstring(func) is None]
+                    else:
+                        undocumented = [func for func, docstring in _FUNC_DOCSTRING_RE.findall(content) if not docstring]
+                    for func in undocumented:
                         issues.append({
                             "type": "documentation",
                             "severity": "low",
                             "message": f"Missing docstring for function: {func}"
                         })
+                    
+                    # Check for bare except clauses
+                    for lineno in audit.bare_excepts if audit else []:
+                        issues.append({
+                            "type": "error_handling",
+                            "severity": "medium",
+                            "message": f"Bare except clause at line {lineno}"
+                        })
             
             return {
                 "status": "success",
@@ -116,12 +310,10 @@ class FixCodeIssueTool(BaseTool):
             if not os.path.exists(self.file_path):
                 return {"status": "error", "message": f"File not found: {self.file_path}"}
             
-            # Create backup
+            # Create backup: a byte-for-byte copy done in the kernel (sendfile/copy_file_range) where supported
             backup_path = f"{self.file_path}.backup"
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                original_content = f.read()
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                f.write(original_content)
+            shutil.copyfile(self.file_path, backup_path)
+            original_content = read_source(self.file_path)
             
             # Apply fixes based on issue type
             fixed_content = original_content
@@ -129,36 +321,29 @@ class FixCodeIssueTool(BaseTool):
             
             if self.issue_type == "error_handling":
                 # Add try-except blocks around risky operations
-                patterns = [
-                    (r'(requests\.\w+\([^)]+\))', r'try:\n    \1\nexcept Exception as e:\n    print(f"Error: {e}")\n    return None'),
-                    (r'(open\([^)]+\))', r'try:\n    \1\nexcept IOError as e:\n    print(f"File error: {e}")\n    return None')
-                ]
-                for pattern, replacement in patterns:
-                    if re.search(pattern, fixed_content):
-                        fixed_content = re.sub(pattern, replacement, fixed_content)
+                for pattern, replacement in _ERROR_HANDLING_FIXES:
+                    if pattern.search(fixed_content):
+                        fixed_content = pattern.sub(replacement, fixed_content)
                         changes_made.append("Added error handling")
             
             elif self.issue_type == "imports":
-                # Remove unused imports
+                # Remove top-level import statements none of whose names are used
+                tree = ast.parse(fixed_content)
+                top_level = set(map(id, tree.body))
+                drop_lines = set()
+                for node, names in AuditVisitor.scan(tree).unused_imports():
+                    if id(node) in top_level and names and len(names) == len(node.names):
+                        drop_lines.update(range(node.lineno, node.end_lineno + 1))
+                        changes_made.extend(f"Removed unused import: {name}" for name in names)
                 lines = fixed_content.split('\n')
-                new_lines = []
-                for line in lines:
-                    if line.startswith('import ') or line.startswith('from '):
-                        module = re.search(r'import\s+(\w+)|from\s+[\w.]+\s+import\s+(\w+)', line)
-                        if module:
-                            mod_name = module.group(1) or module.group(2)
-                            if fixed_content.count(mod_name) > 1:  # Used elsewhere
-                                new_lines.append(line)
-                            else:
-                                changes_made.append(f"Removed unused import: {mod_name}")
-                    else:
-                        new_lines.append(line)
-                fixed_content = '\n'.join(new_lines)
+                fixed_content = '\n'.join(line for i, line in enumerate(lines, 1) if i not in drop_lines)
             
             # Write fixed content
             if changes_made:
                 with open(self.file_path, 'w', encoding='utf-8') as f:
                     f.write(fixed_content)
+                # Don't trust mtime alone: a rewrite within the filesystem's timestamp resolution keeps it
+                _read_file.cache_clear()
             
             return {
                 "status": "success",
@@ -181,36 +366,41 @@ class RefactorCodeTool(BaseTool):
             if not os.path.exists(self.file_path):
                 return {"status": "error", "message": f"File not found: {self.file_path}"}
             
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = read_source(self.file_path)
             
             suggestions = []
             
-            # Analyze code complexity
-            functions = re.findall(r'def\s+(\w+)\s*\([^)]*\):[^}]+?(?=\ndef|\Z)', content, re.DOTALL)
-            for func_content in functions:
-                lines = func_content.split('\n')
-                if len(lines) > 50:
+            # Analyze code complexity: function lengths from the AST (regex if the file doesn't parse)
+            try:
+                function_lengths = [func.end_lineno - func.lineno + 1
+                                    for func in AuditVisitor.scan(ast.parse(content)).functions]
+            except SyntaxError:
+                function_lengths = [len(func_content.split('\n')) for func_content in _FUNC_BODY_RE.findall(content)]
+            many_loops = occurs_more_than(content, 'for ', 2) or occurs_more_than(content, 'while ', 1)
+            for length in function_lengths:
+                if length > 50:
                     suggestions.append({
                         "type": "complexity",
-                        "message": f"Function is too long ({len(lines)} lines). Consider breaking it down."
+                        "message": f"Function is too long ({length} lines). Consider breaking it down."
                     })
                 
                 # Check for nested loops
-                if content.count('for ') > 2 or content.count('while ') > 1:
+                if many_loops:
                     suggestions.append({
                         "type": "nested_loops",
                         "message": "Multiple nested loops detected. Consider extracting to separate functions."
                     })
             
-            # Check for duplicate code
+            # Check for duplicate code: one pass over 5-line windows, keyed by the tuple of lines
             lines = content.split('\n')
-            for i in range(len(lines) - 10):
-                block = '\n'.join(lines[i:i+5])
-                if block and content.count(block) > 1:
+            seen_blocks = {}
+            for i in range(len(lines) - 4):
+                block = tuple(lines[i:i+5])
+                first = seen_blocks.setdefault(block, i)
+                if first != i:
                     suggestions.append({
                         "type": "duplication",
-                        "message": f"Duplicate code detected at line {i+1}. Extract to a function."
+                        "message": f"Duplicate code detected at line {first+1}. Extract to a function."
                     })
                     break
             
@@ -222,6 +412,75 @@ class RefactorCodeTool(BaseTool):
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+# Directories the project scans never descend into
+PROJECT_SCAN_SKIP_DIRS = frozenset({'.git', '__pycache__', 'node_modules', 'agency-swarm', 'venv', '.venv', 'dist', 'build'})
+
+def iter_python_files(root='.'):
+    """Yield the path of every .py file under root, skipping PROJECT_SCAN_SKIP_DIRS
+    
+    Uses os.scandir, so names are matched on the directory entries without a stat per file.
+    """
+    with os.scandir(root) as entries:
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in PROJECT_SCAN_SKIP_DIRS:
+                    subdirs.append(entry.path)
+            elif entry.name.endswith('.py'):
+                yield entry.path
+    for subdir in subdirs:
+        yield from iter_python_files(subdir)
+
+# Per-test outcome lines from pytest's -rA short summary, e.g. "FAILED tests/test_x.py::test_y - assert 1 == 2"
+_PYTEST_SUMMARY_RE = re.compile(r'^(PASSED|FAILED|ERROR|XPASS|XFAIL) (\S+?)(?:::\S*)?(?: - .*)?$', re.MULTILINE)
+# "____ ERROR collecting tests/test_x.py ____" style headers, up to the next header or "====" rule
+_PYTEST_SECTION_RE = re.compile(r'^_{3,} (.+?) _{3,}$(.*?)(?=^_{3,} |^={3,}|\Z)', re.MULTILINE | re.DOTALL)
+
+def pytest_output_for(stdout, test_file):
+    """The stdout sections pytest printed about test_file, else its closing summary line"""
+    name = os.path.normpath(test_file)
+    sections = [match.group(0).rstrip() for match in _PYTEST_SECTION_RE.finditer(stdout)
+                if test_file in match.group(1) or name in os.path.normpath(match.group(1))]
+    if sections:
+        return '\n'.join(sections)
+    lines = [line for line in stdout.splitlines() if line.strip()]
+    return lines[-1] if lines else ''
+
+def run_test_files(test_files):
+    """
+    Run every test file in one pytest process and summarize the outcome per file
+    
+    Interpreter and plugin startup is paid once; with pytest-xdist installed the tests
+    are also spread across all cores.
+    """
+    # One file that fails to import must not stop the others from running
+    command = ['python', '-m', 'pytest', *test_files, '-q', '--tb=short', '-rA', '--rootdir=.',
+               '--continue-on-collection-errors']
+    if importlib.util.find_spec('xdist'):
+        command += ['-n', 'auto']
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=30 * len(test_files))
+    except subprocess.TimeoutExpired:
+        return [{"file": test_file, "passed": False, "output": "Test timed out"} for test_file in test_files]
+    
+    lines_by_file = {}
+    for match in _PYTEST_SUMMARY_RE.finditer(result.stdout):
+        lines_by_file.setdefault(os.path.normpath(match.group(2)), []).append(match.group(0))
+    
+    results = []
+    for test_file in test_files:
+        lines = lines_by_file.get(os.path.normpath(test_file), [])
+        if lines:
+            passed = not any(line.startswith(('FAILED', 'ERROR')) for line in lines)
+            output = '\n'.join(lines)
+        else:
+            # Nothing reported for the file: no tests collected, or pytest itself failed.
+            # Exit code 1 only means some other file had failures
+            passed = result.returncode in (0, 1, 5)
+            output = pytest_output_for(result.stdout, test_file) or result.stderr or "No tests collected"
+        results.append({"file": test_file, "passed": passed, "output": output})
+    return results
+
 class RunTestsTool(BaseTool):
     """
     Runs tests to verify fixes and improvements.
@@ -232,11 +491,7 @@ class RunTestsTool(BaseTool):
     def run(self):
         try:
             # Check for test files
-            test_files = []
-            for root, dirs, files in os.walk('.'):
-                for file in files:
-                    if file.startswith('test_') and file.endswith('.py'):
-                        test_files.append(os.path.join(root, file))
+            test_files = [path for path in iter_python_files() if os.path.basename(path).startswith('test_')]
             
             if not test_files:
                 return {
@@ -244,30 +499,10 @@ class RunTestsTool(BaseTool):
                     "message": "No test files found. Creating basic tests recommended."
                 }
             
-            # Run tests
-            results = []
-            for test_file in test_files:
-                if self.test_file and test_file != self.test_file:
-                    continue
-                
-                try:
-                    result = subprocess.run(
-                        ['python', '-m', 'pytest', test_file, '-v'],
-                        capture_output=True,
-                        text=True,
-                        timeout=30
-                    )
-                    results.append({
-                        "file": test_file,
-                        "passed": result.returncode == 0,
-                        "output": result.stdout if result.returncode == 0 else result.stderr
-                    })
-                except subprocess.TimeoutExpired:
-                    results.append({
-                        "file": test_file,
-                        "passed": False,
-                        "output": "Test timed out"
-                    })
+            # Run tests: one pytest invocation for all of them
+            if self.test_file:
+                test_files = [test_file for test_file in test_files if test_file == self.test_file]
+            results = run_test_files(test_files) if test_files else []
             
             return {
                 "status": "success",
@@ -288,27 +523,16 @@ class OptimizePerformanceTool(BaseTool):
             if not os.path.exists(self.file_path):
                 return {"status": "error", "message": f"File not found: {self.file_path}"}
             
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = read_source(self.file_path)
             
             optimizations = []
             
             # Check for inefficient patterns
-            patterns = [
-                (r'for .+ in range\(len\((.+)\)\):', "Use enumerate() instead of range(len())"),
-                (r'\.append\(.+\) for .+ in', "Consider using list comprehension"),
-                (r'time\.sleep\(', "Avoid blocking sleep in production code"),
-                (r'SELECT \* FROM', "Avoid SELECT *, specify columns explicitly"),
-                (r'except:\s*\n\s*pass', "Avoid bare except with pass"),
-                (r'global\s+\w+', "Avoid global variables, use class attributes or return values"),
-            ]
-            
-            for pattern, suggestion in patterns:
-                if re.search(pattern, content):
-                    optimizations.append({
-                        "pattern": pattern,
-                        "suggestion": suggestion
-                    })
+            for pattern, suggestion in match_performance_patterns(content):
+                optimizations.append({
+                    "pattern": pattern.pattern,
+                    "suggestion": suggestion
+                })
             
             # Check for missing caching
             if 'def ' in content and 'cache' not in content.lower():
@@ -342,14 +566,10 @@ class CreateDocumentationTool(BaseTool):
                 "has_env_example": os.path.exists(".env.example")
             }
             
-            for root, dirs, files in os.walk('.'):
-                if 'agency-swarm' in root or '__pycache__' in root:
-                    continue
-                for file in files:
-                    if file.endswith('.py'):
-                        project_info["python_files"].append(os.path.join(root, file))
-                    if file.startswith('test_'):
-                        project_info["has_tests"] = True
+            project_info["python_files"] = list(iter_python_files())
+            project_info["has_tests"] = any(
+                os.path.basename(path).startswith('test_') for path in project_info["python_files"]
+            )
             
             doc_content = ""
             
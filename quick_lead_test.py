@@ -2,18 +2,35 @@
 """Quick test to verify lead generation is working"""
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
 import json
 import time
 
 BASE_URL = "http://localhost:5001"
 
+# Status polling: start fast, back off to at most POLL_MAX_DELAY, give up after POLL_TIMEOUT seconds
+POLL_INITIAL_DELAY = 0.1
+POLL_MAX_DELAY = 2.0
+POLL_BACKOFF = 1.7
+POLL_TIMEOUT = 30
+
+# One keep-alive connection for the health check, the submit and every status poll.
+# Only idempotent requests are retried, so a flaky submit never starts a second job.
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=1,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+
 print("\n🔍 QUICK LEAD GENERATION TEST")
 print("="*40)
 
 # Step 1: Check API health
 print("\n1. Checking API health...")
 try:
-    health = requests.get(f"{BASE_URL}/api/health", timeout=5)
+    health = SESSION.get(f"{BASE_URL}/api/health", timeout=5)
     if health.status_code == 200:
         data = health.json()
         print(f"   ✅ API is healthy")
@@ -40,7 +57,7 @@ print(f"   Location: {payload['location']}")
 print(f"   Limit: {payload['limit']}")
 
 try:
-    response = requests.post(f"{BASE_URL}/api/generate", json=payload, timeout=10)
+    response = SESSION.post(f"{BASE_URL}/api/generate", json=payload, timeout=10)
     
     if response.status_code != 200:
         print(f"   ❌ Failed to submit job: {response.status_code}")
@@ -57,11 +74,16 @@ except Exception as e:
 
 # Step 3: Check job status
 print("\n3. Checking job status...")
-for i in range(15):  # Check for 30 seconds max
-    time.sleep(2)
+delay = POLL_INITIAL_DELAY
+deadline = time.monotonic() + POLL_TIMEOUT
+i = 0
+while time.monotonic() < deadline:
+    time.sleep(delay)
+    delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
+    i += 1
     
     try:
-        status_resp = requests.get(f"{BASE_URL}/api/status/{job_id}", timeout=5)
+        status_resp = SESSION.get(f"{BASE_URL}/api/status/{job_id}", timeout=5)
         
         if status_resp.status_code != 200:
             print(f"   ❌ Status check failed: {status_resp.status_code}")
@@ -71,7 +93,7 @@ for i in range(15):  # Check for 30 seconds max
         status = status_data.get('status', 'unknown')
         progress = status_data.get('progress', 0)
         
-        print(f"   Attempt {i+1}: Status={status}, Progress={progress}%")
+        print(f"   Attempt {i}: Status={status}, Progress={progress}%")
         
         if status == 'completed':
             leads = status_data.get('results', [])
@@ -23,15 +23,17 @@ def load_job_result_file(job_id: str) -> str:
     return result_file
 
 
+VERIFIED_FLAGS = frozenset({'true', '1', 'yes'})
+
+
 def filter_leads_for_instantly(records: List[Dict]) -> List[Dict]:
     out = []
     for r in records:
-        email = str(r.get('Email', '')).strip()
+        get = r.get
+        email = str(get('Email', '')).strip()
         if not email or email == 'NA':
             continue
-        status = str(r.get('Email_Status', '')).lower()
-        verified_flag = str(r.get('Email_Verified', '')).lower()
-        if status == 'valid' or verified_flag in ('true', '1', 'yes'):
+        if str(get('Email_Status', '')).lower() == 'valid' or str(get('Email_Verified', '')).lower() in VERIFIED_FLAGS:
             out.append(r)
     # If nothing verified, fall back to any email
     if not out:
@@ -4,16 +4,22 @@ Analyzes Apollo CSV data and generates hyper-personalized emails
 """
 
 import os
+import asyncio
+import concurrent.futures
 import logging
 import pandas as pd
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from .smart_lead_analyzer import SmartLeadAnalyzer
 from .apollo_smart_personalizer import ApolloSmartPersonalizer
+from .utils import write_dataframe_csv
 
 logger = logging.getLogger(__name__)
 
+# Max leads whose emails are being generated with OpenAI at once
+EMAIL_CONCURRENCY = int(os.getenv('APOLLO_EMAIL_CONCURRENCY', '20'))
+
 
 class ApolloLeadProcessor:
     """Process Apollo leads with deep personalization"""
@@ -94,6 +100,24 @@ class ApolloLeadProcessor:
     
     def generate_personalized_email(self, analysis: Dict[str, Any]) -> str:
         """Generate hyper-personalized email based on lead analysis - ONLY 2 LINES"""
+        try:
+            response = self.client.chat.completions.create(**self._email_request(analysis))
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logger.error(f"Error generating email: {e}")
+            return self._fallback_email(analysis)
+    
+    async def generate_personalized_email_async(self, analysis: Dict[str, Any], client: AsyncOpenAI) -> str:
+        """generate_personalized_email on an async client opened by the caller, so many leads can be awaited together"""
+        try:
+            response = await client.chat.completions.create(**self._email_request(analysis))
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logger.error(f"Error generating email: {e}")
+            return self._fallback_email(analysis)
+    
+    def _email_request(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Chat completion arguments for a lead's 2-line email"""
         
         # Build the prompt for GPT
         prompt = f"""
@@ -121,22 +145,51 @@ class ApolloLeadProcessor:
         - Just 2 simple sentences
         """
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You write simple emails at 6th grade level. Use short sentences. Talk like a normal person. ONLY 2 sentences, no greetings or closings."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=100
-            )
-            
-            return response.choices[0].message.content.strip()
+        return dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You write simple emails at 6th grade level. Use short sentences. Talk like a normal person. ONLY 2 sentences, no greetings or closings."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=100
+        )
+    
+    def _fallback_email(self, analysis: Dict[str, Any]) -> str:
+        """Template email for when OpenAI is unavailable"""
+        return f"Your {analysis['industry']} company with {analysis['employees']} employees likely faces scaling challenges.\n\nWe could build automation specifically for {analysis['industry']} that addresses these pain points."
+    
+    async def _generate_emails(self, leads: List[Dict[str, Any]], analyses: List[Dict[str, Any]]) -> List[str]:
+        """
+        Emails for every lead, with at most EMAIL_CONCURRENCY leads in flight; results keep lead order
+        
+        The AsyncOpenAI client is opened and closed here, once per event loop: its connection
+        pool is bound to the loop, so a client kept on the processor breaks the next asyncio.run.
+        """
+        semaphore = asyncio.Semaphore(EMAIL_CONCURRENCY)
+        
+        async with AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY')) as client:
+            async def one(lead, analysis):
+                async with semaphore:
+                    # Generate personalized email using the new smart personalizer
+                    try:
+                        return await self.smart_personalizer.generate_personalized_email_async(lead, client)
+                    except Exception as e:
+                        logger.error(f"Error with smart personalizer: {e}")
+                        # Fallback to basic personalization
+                        return await self.generate_personalized_email_async(analysis, client)
             
-        except Exception as e:
-            logger.error(f"Error generating email: {e}")
-            return f"Your {analysis['industry']} company with {analysis['employees']} employees likely faces scaling challenges.\n\nWe could build automation specifically for {analysis['industry']} that addresses these pain points."
+            return await asyncio.gather(*(one(lead, analysis) for lead, analysis in zip(leads, analyses)))
+    
+    def _run_email_generation(self, leads: List[Dict[str, Any]], analyses: List[Dict[str, Any]]) -> List[str]:
+        """Run _generate_emails to completion, on a worker thread when called inside a running event loop"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._generate_emails(leads, analyses))
+        # asyncio.run refuses to nest, so give the coroutine its own loop on another thread
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self._generate_emails(leads, analyses)).result()
     
     def generate_smart_email(self, lead: pd.Series) -> str:
         """Generate email using smart analysis instead of templates"""
@@ -162,22 +215,22 @@ class ApolloLeadProcessor:
         
         logger.info(f"Processing {len(df)} leads from Apollo")
         
-        # Process each lead
-        results = []
+        # Pass 1: analyze every lead (no API calls)
+        leads, analyses = [], []
         for idx, lead in df.iterrows():
             try:
-                # Analyze lead
-                analysis = self.analyze_lead(lead)
-                
-                # Generate personalized email using the new smart personalizer
-                try:
-                    email = self.smart_personalizer.generate_personalized_email(lead.to_dict())
-                except Exception as e:
-                    logger.error(f"Error with smart personalizer: {e}")
-                    # Fallback to basic personalization
-                    email = self.generate_personalized_email(analysis)
-                
-                # Compile results
+                analyses.append(self.analyze_lead(lead))
+                leads.append(lead.to_dict())
+            except Exception as e:
+                logger.error(f"Error processing lead {idx}: {e}")
+        
+        # Pass 2: generate all the emails concurrently
+        emails = self._run_email_generation(leads, analyses)
+        
+        # Pass 3: compile results
+        results = []
+        for i, (analysis, email) in enumerate(zip(analyses, emails), 1):
+            try:
                 result = {
                     'first_name': analysis['first_name'],
                     'title': analysis['title'],
@@ -195,10 +248,9 @@ class ApolloLeadProcessor:
                 }
                 
                 results.append(result)
-                logger.info(f"Processed {idx+1}/{len(df)}: {analysis['company']}")
-                
+                logger.info(f"Processed {i}/{len(df)}: {analysis['company']}")
             except Exception as e:
-                logger.error(f"Error processing lead {idx}: {e}")
+                logger.error(f"Error processing lead {analysis['company']}: {e}")
                 continue
         
         # Create results DataFrame
@@ -206,7 +258,7 @@ class ApolloLeadProcessor:
         
         # Save if output path provided
         if output_path:
-            results_df.to_csv(output_path, index=False)
+            write_dataframe_csv(results_df, output_path)
             logger.info(f"Saved personalized emails to {output_path}")
         
         return results_df
@@ -6,7 +6,7 @@ No LinkedIn needed - just smart analysis of what we have
 import os
 import re
 from typing import Dict, Any, List
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import logging
 
 logger = logging.getLogger(__name__)
@@ -117,6 +117,26 @@ class ApolloSmartPersonalizer:
     
     def generate_unique_angle(self, lead_data: Dict[str, Any]) -> Dict[str, str]:
         """Generate a unique angle for this specific company"""
+        request, details, challenges = self._angle_request(lead_data)
+        try:
+            response = self.client.chat.completions.create(**request)
+            return self._parse_angle(response.choices[0].message.content)
+        except Exception as e:
+            logger.error(f"Error generating angle: {e}")
+            return self._fallback_angle(lead_data, details, challenges)
+    
+    async def generate_unique_angle_async(self, lead_data: Dict[str, Any], client: AsyncOpenAI) -> Dict[str, str]:
+        """generate_unique_angle on an async client opened by the caller, so many leads can be awaited together"""
+        request, details, challenges = self._angle_request(lead_data)
+        try:
+            response = await client.chat.completions.create(**request)
+            return self._parse_angle(response.choices[0].message.content)
+        except Exception as e:
+            logger.error(f"Error generating angle: {e}")
+            return self._fallback_angle(lead_data, details, challenges)
+    
+    def _angle_request(self, lead_data: Dict[str, Any]):
+        """Chat completion arguments for a company's angle, plus the details and challenges it was built from"""
         
         description = lead_data.get('organization_short_description', '')
         details = self.extract_unique_details(description)
@@ -146,39 +166,34 @@ class ApolloSmartPersonalizer:
         Be creative and specific. No generic "improve efficiency" bullshit.
         """
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You're an expert at finding unique angles for B2B outreach."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.8,
-                max_tokens=200
-            )
-            
-            content = response.choices[0].message.content
-            
-            # Parse response
-            angle = {
-                'hook': '',
-                'challenge': '',
-                'solution': ''
-            }
-            
-            for line in content.split('\n'):
-                if 'Hook:' in line:
-                    angle['hook'] = line.split('Hook:')[1].strip()
-                elif 'Challenge:' in line:
-                    angle['challenge'] = line.split('Challenge:')[1].strip()
-                elif 'Solution:' in line:
-                    angle['solution'] = line.split('Solution:')[1].strip()
-            
-            return angle
-            
-        except Exception as e:
-            logger.error(f"Error generating angle: {e}")
-            return self._fallback_angle(lead_data, details, challenges)
+        request = dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You're an expert at finding unique angles for B2B outreach."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.8,
+            max_tokens=200
+        )
+        return request, details, challenges
+    
+    def _parse_angle(self, content: str) -> Dict[str, str]:
+        """Parse the Hook/Challenge/Solution lines of an angle response"""
+        angle = {
+            'hook': '',
+            'challenge': '',
+            'solution': ''
+        }
+        
+        for line in content.split('\n'):
+            if 'Hook:' in line:
+                angle['hook'] = line.split('Hook:')[1].strip()
+            elif 'Challenge:' in line:
+                angle['challenge'] = line.split('Challenge:')[1].strip()
+            elif 'Solution:' in line:
+                angle['solution'] = line.split('Solution:')[1].strip()
+        
+        return angle
     
     def _fallback_angle(self, lead_data: Dict[str, Any], details: List[str], challenges: List[str]) -> Dict[str, str]:
         """Fallback angle generation without GPT"""
@@ -220,7 +235,24 @@ class ApolloSmartPersonalizer:
         """Generate truly personalized email from Apollo data"""
         
         angle = self.generate_unique_angle(lead_data)
-        first_name = lead_data.get('first_name', 'there')
+        try:
+            response = self.client.chat.completions.create(**self._email_request(lead_data, angle))
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            return self._fallback_email(angle)
+    
+    async def generate_personalized_email_async(self, lead_data: Dict[str, Any], client: AsyncOpenAI) -> str:
+        """generate_personalized_email on an async client opened by the caller, so many leads can be awaited together"""
+        
+        angle = await self.generate_unique_angle_async(lead_data, client)
+        try:
+            response = await client.chat.completions.create(**self._email_request(lead_data, angle))
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            return self._fallback_email(angle)
+    
+    def _email_request(self, lead_data: Dict[str, Any], angle: Dict[str, str]) -> Dict[str, Any]:
+        """Chat completion arguments for the email built on an angle"""
         company = lead_data.get('organization_name', 'your company')
         
         # Build email using the unique angle
@@ -248,22 +280,19 @@ class ApolloSmartPersonalizer:
         - Just 2 simple sentences
         """
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You write simple, conversational emails at a 6th grade reading level. Use short sentences. Talk like a normal person, not a corporate robot. ONLY write 2 sentences - no greetings or closings."},
-                    {"role": "user", "content": email_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=100
-            )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            # Fallback - just return the 2 customized lines
-            return f"""{angle['hook']} - {angle['challenge']}.
+        return dict(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": "You write simple, conversational emails at a 6th grade reading level. Use short sentences. Talk like a normal person, not a corporate robot. ONLY write 2 sentences - no greetings or closings."},
+                {"role": "user", "content": email_prompt}
+            ],
+            temperature=0.7,
+            max_tokens=100
+        )
+    
+    def _fallback_email(self, angle: Dict[str, str]) -> str:
+        """Fallback - just return the 2 customized lines"""
+        return f"""{angle['hook']} - {angle['challenge']}.
 
 We could build {angle['solution']} that integrates with your existing systems."""
 
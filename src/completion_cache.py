@@ -0,0 +1,75 @@
+"""
+Completion Cache
+Stores OpenAI chat completion results in SQLite so re-scoring the same lead
+with the same prompt skips the API call
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Optional
+
+
+class CompletionCache:
+    """Disk-backed map from a chat completion request to its response text"""
+
+    def __init__(self, db_path: str = 'data/completion_cache.db'):
+        """Initialize the cache with a SQLite database"""
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS completions (
+                    key TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.commit()
+
+    @staticmethod
+    def key_for(request: Dict[str, Any]) -> str:
+        """
+        Fingerprint of a completion request
+
+        The key covers the model, both prompts and the sampling settings, so
+        editing a prompt template or switching models never serves a stale result.
+        """
+        payload = json.dumps(request, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response text for key, or None"""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute('SELECT content FROM completions WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, content: str):
+        """Store the response text for key"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('INSERT OR REPLACE INTO completions (key, content) VALUES (?, ?)', (key, content))
+            conn.commit()
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """get on a worker thread, so a coroutine's lookup doesn't block the event loop"""
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, content: str):
+        """set on a worker thread, so a coroutine's write doesn't block the event loop"""
+        await asyncio.to_thread(self.set, key, content)
+
+    def clear(self) -> int:
+        """Drop every cached completion"""
+        with sqlite3.connect(self.db_path) as conn:
+            deleted = conn.execute('DELETE FROM completions').rowcount
+            conn.commit()
+            return deleted
+
+
+@functools.lru_cache(maxsize=None)
+def default_cache() -> CompletionCache:
+    """Process-wide CompletionCache on the default database"""
+    return CompletionCache()
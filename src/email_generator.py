@@ -4,9 +4,11 @@ AI-powered email generation for outreach
 
 import os
 import logging
-from typing import Dict, Any
-from openai import OpenAI
+import functools
+from typing import Dict, Any, Optional, Tuple
+from openai import OpenAI, AsyncOpenAI
 from .industry_configs import IndustryConfig
+from .completion_cache import CompletionCache
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +16,8 @@ logger = logging.getLogger(__name__)
 class EmailGenerator:
     """Generate personalized outreach emails using AI"""
     
-    def __init__(self, industry: str = 'default'):
-        """Initialize OpenAI client"""
+    def __init__(self, industry: str = 'default', cache: Optional[CompletionCache] = None):
+        """Initialize OpenAI client; pass a CompletionCache to reuse earlier drafts"""
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
@@ -30,6 +32,7 @@ class EmailGenerator:
         self.model = "gpt-3.5-turbo"  # Fast model
         self.industry = industry
         self.config = IndustryConfig.get_config(industry)
+        self.cache = cache
         logger.info(f"Email generator initialized with model: {self.model}, industry: {industry}")
     
     def generate_email(self, lead: Dict[str, Any]) -> str:
@@ -42,26 +45,77 @@ class EmailGenerator:
         Returns:
             Personalized email text
         """
-        prompt = self._create_email_prompt(lead)
+        request = self._completion_kwargs(lead)
+        key, email = self._cached(request)
+        if email is not None:
+            return email
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=400
-            )
+            response = self.client.chat.completions.create(**request)
             
             email = response.choices[0].message.content.strip()
+            self._store(key, email)
             return email
             
         except Exception as e:
             logger.error(f"Error generating email for {lead.get('Name', 'Unknown')}: {e}")
             raise
     
+    async def generate_email_async(self, lead: Dict[str, Any], client: AsyncOpenAI) -> str:
+        """
+        generate_email on an async client, so many leads can be awaited together
+        
+        The caller owns the client: it is bound to the event loop it was opened in, so open it
+        inside the coroutine passed to asyncio.run rather than keeping it on this instance.
+        """
+        request = self._completion_kwargs(lead)
+        key, email = await self._cached_async(request)
+        if email is not None:
+            return email
+        
+        try:
+            response = await client.chat.completions.create(**request)
+            email = response.choices[0].message.content.strip()
+            await self._store_async(key, email)
+            return email
+        except Exception as e:
+            logger.error(f"Error generating email for {lead.get('Name', 'Unknown')}: {e}")
+            raise
+    
+    def _cached(self, request: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """(cache key, cached email) for a request; (None, None) without a cache"""
+        if self.cache is None:
+            return None, None
+        key = self.cache.key_for(request)
+        return key, self.cache.get(key)
+    
+    def _store(self, key: Optional[str], email: str):
+        if key is not None and email:
+            self.cache.set(key, email)
+    
+    async def _cached_async(self, request: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """_cached with the SQLite lookup off the event loop"""
+        if self.cache is None:
+            return None, None
+        key = self.cache.key_for(request)
+        return key, await self.cache.get_async(key)
+    
+    async def _store_async(self, key: Optional[str], email: str):
+        if key is not None and email:
+            await self.cache.set_async(key, email)
+    
+    def _completion_kwargs(self, lead: Dict[str, Any]) -> Dict[str, Any]:
+        """Chat completion arguments for drafting a lead's email"""
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self._get_system_prompt()},
+                {"role": "user", "content": self._create_email_prompt(lead)}
+            ],
+            temperature=0.7,
+            max_tokens=400
+        )
+    
     def _get_system_prompt(self) -> str:
         """Get the system prompt for email generation"""
         value_props = '\n- '.join(self.config['value_propositions'])
@@ -117,4 +171,15 @@ Write a casual, helpful email that:
 3. Offers a simple, actionable tip they can implement
 4. Softly mentions you can help further if they're interested
 
-Keep it under 150 words and conversational."""
\ No newline at end of file
+Keep it under 150 words and conversational."""
+
+
+@functools.lru_cache(maxsize=16)
+def get_email_generator(industry: str = 'default', cache: Optional[CompletionCache] = None) -> EmailGenerator:
+    """
+    Shared EmailGenerator per (industry, cache), so repeated runs skip client and config setup
+    
+    A generator keeps no per-lead state, so one instance can serve any number of calls and
+    threads. It holds no async client, so it is safe to reuse across asyncio.run calls.
+    """
+    return EmailGenerator(industry=industry, cache=cache)
@@ -10,7 +10,8 @@ import re
 import time
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any, List
+from typing import Dict, Optional, Any, List, Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 
@@ -415,26 +416,44 @@ class MailTesterVerifier:
             raw_response=data
         )
     
-    def verify_batch(self, emails: List[str], use_cache: bool = True) -> List[VerificationResult]:
+    def verify_batch(self, emails: List[str], use_cache: bool = True, max_workers: int = 5,
+                     on_result: Optional[Callable[[VerificationResult], None]] = None) -> List[VerificationResult]:
         """
-        Verify multiple email addresses.
+        Verify multiple email addresses concurrently over the shared session.
+        
+        Each distinct address is verified once, with up to max_workers
+        requests in flight.
         
         Args:
             emails: List of email addresses to verify
             use_cache: Whether to use cached results
+            max_workers: Maximum concurrent verification requests
+            on_result: Optional callback invoked as each distinct address finishes
             
         Returns:
-            List of VerificationResult objects
+            List of VerificationResult objects, in the same order as emails
         """
-        results = []
-        total = len(emails)
+        unique_emails = list(dict.fromkeys(emails))
+        if not unique_emails:
+            return []
+        logger.info(f"Verifying {len(unique_emails)} distinct emails with {max_workers} workers")
+        
+        # Fetch the token up front so the workers don't all race to refresh it
+        try:
+            self.get_token()
+        except requests.RequestException:
+            pass  # verify_email reports the failure per address
         
-        for i, email in enumerate(emails, 1):
-            logger.info(f"Verifying email {i}/{total}: {email}")
+        def verify(email):
             result = self.verify_email(email, use_cache=use_cache)
-            results.append(result)
+            if on_result:
+                on_result(result)
+            return result
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique_emails)))) as executor:
+            by_email = dict(zip(unique_emails, executor.map(verify, unique_emails)))
         
-        return results
+        return [by_email[email] for email in emails]
     
     def clear_cache(self):
         """Clear the result cache"""
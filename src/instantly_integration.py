@@ -3,14 +3,23 @@ Instantly.ai Integration for Campaign Management
 Handles email campaign creation, lead import, and sequence management
 """
 
+import os
+import functools
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
+import random
+import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from .utils import read_verified_leads
+
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
@@ -80,6 +89,40 @@ class InstantlyIntegration:
             "Content-Type": "application/json",
             "Authorization": f"Bearer {api_key}"
         }
+        # Pooled session so repeated calls reuse TCP/TLS connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Client-side pacing for lead creation, shared by every job using this client
+        self.min_request_interval = 0.5  # seconds between lead POSTs
+        self._pace_lock = threading.Lock()
+        self._next_request_at = 0.0
+        
+    def _throttle(self):
+        """Block until this caller's request slot comes up (evenly spaced, thread-safe)"""
+        with self._pace_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self.min_request_interval
+        if wait > 0:
+            time.sleep(wait)
+    
+    @staticmethod
+    def _retry_after_seconds(response, default: float) -> float:
+        """Parse a Retry-After header (delta-seconds or HTTP-date), falling back to default"""
+        value = response.headers.get('Retry-After') if response is not None else None
+        if not value:
+            return default
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+            return max(0.0, (when - datetime.now(when.tzinfo)).total_seconds())
+        except (TypeError, ValueError, AttributeError):
+            return default
         
     def _make_request(self, method: str, endpoint: str, data: Dict = None) -> Dict:
         """Make API request to Instantly V2"""
@@ -93,13 +136,13 @@ class InstantlyIntegration:
         
         try:
             if method.upper() == "GET":
-                response = requests.get(url, headers=self.headers, params=data)
+                response = self.session.get(url, headers=self.headers, params=data)
             elif method.upper() == "POST":
-                response = requests.post(url, headers=self.headers, json=data)
+                response = self.session.post(url, headers=self.headers, json=data)
             elif method.upper() == "PUT":
-                response = requests.put(url, headers=self.headers, json=data)
+                response = self.session.put(url, headers=self.headers, json=data)
             elif method.upper() == "DELETE":
-                response = requests.delete(url, headers=self.headers, json=data)
+                response = self.session.delete(url, headers=self.headers, json=data)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
             
@@ -261,9 +304,9 @@ class InstantlyIntegration:
         failed = []
         skipped_duplicates = []
         
-        # Rate limiting settings
-        max_retries = 3
-        base_delay = 0.5  # 500ms between requests
+        # Retry settings; request spacing is handled by _throttle
+        max_retries = 5
+        base_delay = 0.5
         
         for i, lead_data in enumerate(instantly_leads, 1):
             logger.debug(f"Processing lead {i}/{len(instantly_leads)}: {lead_data.get('email')} ({lead_data.get('first_name')} {lead_data.get('last_name')})")
@@ -272,6 +315,7 @@ class InstantlyIntegration:
             for retry in range(max_retries):
                 try:
                     # Send lead with campaign assignment
+                    self._throttle()
                     result = self._make_request("POST", "leads", lead_data)
                     
                     if isinstance(result, dict) and 'id' in result:
@@ -289,8 +333,14 @@ class InstantlyIntegration:
                     
                 except requests.exceptions.HTTPError as e:
                     if e.response.status_code == 429:  # Rate limit
-                        retry_after = int(e.response.headers.get('Retry-After', 5))
-                        logger.warning(f"Rate limit hit, waiting {retry_after} seconds...")
+                        if retry == max_retries - 1:
+                            logger.error(f"Still rate limited after {max_retries} attempts: {lead_data.get('email')}")
+                            failed.append(lead_data.get('email'))
+                            break
+                        # Honor Retry-After, otherwise back off exponentially with jitter
+                        retry_after = self._retry_after_seconds(e.response, base_delay * (2 ** (retry + 1)))
+                        retry_after += random.uniform(0, base_delay)
+                        logger.warning(f"Rate limit hit, waiting {retry_after:.1f} seconds...")
                         time.sleep(retry_after)
                         continue
                     elif e.response.status_code in (400, 409):
@@ -315,11 +365,7 @@ class InstantlyIntegration:
                         logger.error(f"Could not add lead after {max_retries} attempts")
                         failed.append(lead_data.get('email'))
                     else:
-                        time.sleep(base_delay * (2 ** retry))  # Exponential backoff
-            
-            # Rate limiting between successful requests
-            if i < len(instantly_leads):
-                time.sleep(base_delay)
+                        time.sleep(base_delay * (2 ** retry) + random.uniform(0, base_delay))  # Exponential backoff with jitter
         
         logger.info(f"Lead import results: {len(results)} added, {len(failed)} failed, {len(skipped_duplicates)} duplicates out of {len(instantly_leads)} total")
         if failed:
@@ -329,7 +375,64 @@ class InstantlyIntegration:
             return {"success": True, "added": len(results), "failed": len(failed), "skipped_duplicates": len(skipped_duplicates)}
         else:
             raise Exception(f"ALL {len(instantly_leads)} leads failed to add to Instantly!")
-        
+
+    def add_leads_in_slices(self, campaign_id: str, leads: List[InstantlyLead],
+                            slice_size: int = 500, max_concurrency: int = 4) -> Dict:
+        """
+        Add a large lead list as independent slices, a few at a time.
+
+        Every slice goes through add_leads_to_campaign and shares this client's
+        request pacing, so the overall request rate is unchanged. What changes is
+        that a slice that fails, or sits in rate-limit backoff, doesn't hold up
+        or sink the others. Failed slices are reported by lead range, so only
+        those leads need retrying.
+        """
+        # Drop cross-slice duplicates up front; each slice only dedupes itself.
+        # Leads without an email are passed through rather than collapsed into one
+        unique_leads = []
+        seen_emails = set()
+        for lead in leads:
+            email = str(lead.email or '').strip().lower()
+            if email:
+                if email in seen_emails:
+                    continue
+                seen_emails.add(email)
+            unique_leads.append(lead)
+
+        slices = [(start, unique_leads[start:start + slice_size])
+                  for start in range(0, len(unique_leads), slice_size)]
+
+        def add_slice(item):
+            start, chunk = item
+            try:
+                return start, len(chunk), self.add_leads_to_campaign(campaign_id, chunk), None
+            except Exception as e:
+                logger.error(f"Slice of leads {start}-{start + len(chunk) - 1} failed: {e}")
+                return start, len(chunk), None, str(e)
+
+        added = failed = skipped_duplicates = 0
+        failed_slices = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(slices)))) as executor:
+            for start, size, result, error in executor.map(add_slice, slices):
+                if error is not None or not result.get('success'):
+                    failed += size
+                    failed_slices.append({'start': start, 'end': start + size,
+                                          'error': error or result.get('message', '')})
+                    continue
+                added += result.get('added', 0)
+                failed += result.get('failed', 0)
+                skipped_duplicates += result.get('skipped_duplicates', 0)
+
+        logger.info(f"Sliced import: {added} added, {failed} failed, {skipped_duplicates} duplicates, "
+                    f"{len(failed_slices)}/{len(slices)} slices failed")
+        return {"success": added > 0 or skipped_duplicates > 0,
+                "added": added,
+                "succeeded": added,
+                "failed": failed,
+                "skipped_duplicates": skipped_duplicates,
+                "slice_size": slice_size,
+                "failed_slices": failed_slices}
+
     def bulk_import_leads(self, leads: List[InstantlyLead], 
                          campaign_id: str = None) -> Dict:
         """
@@ -645,6 +748,37 @@ def map_to_industry(search_term):
         return 'Other'
 
 
+# Lead fields copied into Instantly custom variables
+# Updated to match standardized CSV column names after DataFrame standardization
+R27_CUSTOM_FIELD_MAPPING = {
+    'SocialMediaLinks': 'social_media_links', 
+    'Reviews': 'reviews',
+    'Images': 'images',
+    'Rating': 'rating',
+    'ReviewCount': 'review_count',
+    'GoogleBusinessClaimed': 'google_business_claimed',
+
+    # Email verification fields - check both old and new standardized names
+    'email_source': 'email_source',
+    'Email_Source': 'email_source',  # From CSV standardization
+    'email_quality_boost': 'email_quality_boost', 
+    'Email_Quality_Boost': 'email_quality_boost',  # From CSV standardization
+    'Email_Status': 'email_status',  # From CSV standardization
+    'Email_Score': 'email_score',    # From CSV standardization
+
+    # Search metadata
+    'SearchKeyword': 'search_term',  # Keep original search term
+    'Location': 'search_location',
+    'LeadScore': 'lead_score',
+    'DraftEmail': 'draft_email'  # Re-added with proper handling
+}
+
+# Every lead column convert_r27_leads_to_instantly reads; callers can drop the rest before converting
+R27_SOURCE_COLUMNS = frozenset(R27_CUSTOM_FIELD_MAPPING) | {
+    'Name', 'Email', 'Phone', 'Website', 'Location', 'Address', 'SearchKeyword', 'types'
+}
+
+
 def convert_r27_leads_to_instantly(leads_data: List[Dict]) -> List[InstantlyLead]:
     """Convert R27 lead format to Instantly lead format"""
     instantly_leads = []
@@ -659,31 +793,6 @@ def convert_r27_leads_to_instantly(leads_data: List[Dict]) -> List[InstantlyLead
         # Create custom variables for ALL additional data from CSV
         custom_vars = {}
         
-        # Map selected fields from the lead data as custom variables  
-        # Updated to match standardized CSV column names after DataFrame standardization
-        field_mapping = {
-            'SocialMediaLinks': 'social_media_links', 
-            'Reviews': 'reviews',
-            'Images': 'images',
-            'Rating': 'rating',
-            'ReviewCount': 'review_count',
-            'GoogleBusinessClaimed': 'google_business_claimed',
-            
-            # Email verification fields - check both old and new standardized names
-            'email_source': 'email_source',
-            'Email_Source': 'email_source',  # From CSV standardization
-            'email_quality_boost': 'email_quality_boost', 
-            'Email_Quality_Boost': 'email_quality_boost',  # From CSV standardization
-            'Email_Status': 'email_status',  # From CSV standardization
-            'Email_Score': 'email_score',    # From CSV standardization
-            
-            # Search metadata
-            'SearchKeyword': 'search_term',  # Keep original search term
-            'Location': 'search_location',
-            'LeadScore': 'lead_score',
-            'DraftEmail': 'draft_email'  # Re-added with proper handling
-        }
-        
         # Add business name as custom variable
         if lead.get('Name'):
             custom_vars['business_name'] = str(lead['Name'])
@@ -714,7 +823,7 @@ def convert_r27_leads_to_instantly(leads_data: List[Dict]) -> List[InstantlyLead
                 pass
         
         # Add other available fields as custom variables
-        for original_field, custom_field in field_mapping.items():
+        for original_field, custom_field in R27_CUSTOM_FIELD_MAPPING.items():
             if lead.get(original_field) is not None and lead.get(original_field) != 'NA':
                 # Convert to string and handle different data types
                 value = lead[original_field]
@@ -742,6 +851,29 @@ def convert_r27_leads_to_instantly(leads_data: List[Dict]) -> List[InstantlyLead
     return instantly_leads
 
 
+@functools.lru_cache(maxsize=16)
+def _verified_rows_for(result_file: str, mtime_ns: int, limit: Optional[int] = None) -> tuple:
+    """A result file's verified rows as frozen (column, value) tuples; mtime_ns keys out stale entries"""
+    leads = read_verified_leads(result_file, R27_SOURCE_COLUMNS, limit=limit)
+    return tuple(tuple(lead.items()) for lead in leads)
+
+
+def converted_leads_for(result_file: str, st: Optional[os.stat_result] = None,
+                        limit: Optional[int] = None) -> tuple:
+    """Memoized read + filter, so retried imports of the same job skip the CSV work
+    
+    Pass the file's os.stat result as st if the caller already has it, and limit
+    to stop after that many verified leads. The cache holds plain rows only; every
+    call converts them into fresh InstantlyLead objects the caller is free to modify.
+    """
+    if st is None:
+        st = os.stat(result_file)
+    if st.st_size == 0:
+        return ()
+    rows = _verified_rows_for(result_file, st.st_mtime_ns, limit)
+    return tuple(convert_r27_leads_to_instantly([dict(row) for row in rows]))
+
+
 # Example usage functions
 def create_campaign_from_r27_leads(instantly_api: InstantlyIntegration, 
                                    leads_data: List[Dict], 
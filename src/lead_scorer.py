@@ -4,10 +4,12 @@ AI-powered lead scoring using OpenAI
 
 import os
 import logging
+import functools
 import json
-from typing import Tuple, Dict, Any
-from openai import OpenAI
+from typing import Tuple, Dict, Any, Optional
+from openai import OpenAI, AsyncOpenAI
 from .industry_configs import IndustryConfig
+from .completion_cache import CompletionCache
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +17,8 @@ logger = logging.getLogger(__name__)
 class LeadScorer:
     """Score leads using AI based on R27 rules"""
     
-    def __init__(self, industry: str = 'default'):
-        """Initialize OpenAI client"""
+    def __init__(self, industry: str = 'default', cache: Optional[CompletionCache] = None):
+        """Initialize OpenAI client; pass a CompletionCache to reuse earlier scores"""
         api_key = os.getenv('OPENAI_API_KEY')
         if not api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
@@ -25,6 +27,7 @@ class LeadScorer:
         self.model = "gpt-3.5-turbo"  # Fast model
         self.industry = industry
         self.config = IndustryConfig.get_config(industry)
+        self.cache = cache
         logger.info(f"Lead scorer initialized with model: {self.model}, industry: {industry}")
     
     def score_lead(self, lead: Dict[str, Any]) -> Tuple[int, str]:
@@ -37,27 +40,78 @@ class LeadScorer:
         Returns:
             Tuple of (score 0-10, reasoning)
         """
-        prompt = self._create_scoring_prompt(lead)
+        request = self._completion_kwargs(lead)
+        key, content = self._cached(request)
+        if content is not None:
+            return self._parse_score_response(content)
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-                max_tokens=300
-            )
+            response = self.client.chat.completions.create(**request)
             
             # Parse the response
             content = response.choices[0].message.content
+            self._store(key, content)
             return self._parse_score_response(content)
             
         except Exception as e:
             logger.error(f"Error scoring lead {lead.get('Name', 'Unknown')}: {e}")
             raise
     
+    async def score_lead_async(self, lead: Dict[str, Any], client: AsyncOpenAI) -> Tuple[int, str]:
+        """
+        score_lead on an async client, so many leads can be awaited together
+        
+        The caller owns the client: it is bound to the event loop it was opened in, so open it
+        inside the coroutine passed to asyncio.run rather than keeping it on this instance.
+        """
+        request = self._completion_kwargs(lead)
+        key, content = await self._cached_async(request)
+        if content is not None:
+            return self._parse_score_response(content)
+        
+        try:
+            response = await client.chat.completions.create(**request)
+            content = response.choices[0].message.content
+            await self._store_async(key, content)
+            return self._parse_score_response(content)
+        except Exception as e:
+            logger.error(f"Error scoring lead {lead.get('Name', 'Unknown')}: {e}")
+            raise
+    
+    def _cached(self, request: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """(cache key, cached response text) for a request; (None, None) without a cache"""
+        if self.cache is None:
+            return None, None
+        key = self.cache.key_for(request)
+        return key, self.cache.get(key)
+    
+    def _store(self, key: Optional[str], content: str):
+        if key is not None and content:
+            self.cache.set(key, content)
+    
+    async def _cached_async(self, request: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """_cached with the SQLite lookup off the event loop"""
+        if self.cache is None:
+            return None, None
+        key = self.cache.key_for(request)
+        return key, await self.cache.get_async(key)
+    
+    async def _store_async(self, key: Optional[str], content: str):
+        if key is not None and content:
+            await self.cache.set_async(key, content)
+    
+    def _completion_kwargs(self, lead: Dict[str, Any]) -> Dict[str, Any]:
+        """Chat completion arguments for scoring a lead"""
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self._get_system_prompt()},
+                {"role": "user", "content": self._create_scoring_prompt(lead)}
+            ],
+            temperature=0.2,
+            max_tokens=300
+        )
+    
     def _get_system_prompt(self) -> str:
         """Get the system prompt for lead scoring"""
         # Build scoring rules text from config
@@ -126,4 +180,15 @@ Apply the R27 scoring rules and provide your score and reasoning."""
             reasoning_start = response.index('Reasoning:') + len('Reasoning:')
             reasoning = response[reasoning_start:].strip()
         
-        return score, reasoning
\ No newline at end of file
+        return score, reasoning
+
+
+@functools.lru_cache(maxsize=16)
+def get_scorer(industry: str = 'default', cache: Optional[CompletionCache] = None) -> LeadScorer:
+    """
+    Shared LeadScorer per (industry, cache), so repeated runs skip client and config setup
+    
+    A scorer keeps no per-lead state, so one instance can serve any number of calls and
+    threads. It holds no async client, so it is safe to reuse across asyncio.run calls.
+    """
+    return LeadScorer(industry=industry, cache=cache)
@@ -0,0 +1,323 @@
+"""
+R27 lead generation pipeline
+Fetch, normalize, verify, score, draft emails and write the CSV
+"""
+
+import os
+import sys
+import csv
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
+from tqdm import tqdm
+from openai import AsyncOpenAI
+
+from .providers import get_provider
+from .lead_scorer import LeadScorer, get_scorer
+from .email_generator import EmailGenerator, get_email_generator
+from .data_normalizer import DataNormalizer
+from .email_verifier import MailTesterVerifier, EmailStatus
+from .completion_cache import CompletionCache, default_cache
+from .utils import safe_query_filename
+
+logger = logging.getLogger(__name__)
+
+# Max OpenAI requests in flight at once for scoring and email generation
+SCORE_CONCURRENCY = int(os.getenv('SCORE_CONCURRENCY', '20'))
+
+# Lead score adjustment per verification status; anything not listed gets 0
+EMAIL_QUALITY_BOOST = {
+    EmailStatus.VALID: 20,
+    EmailStatus.CATCH_ALL: 10,
+    EmailStatus.ROLE_BASED: 5,
+    EmailStatus.INVALID: -50,
+    EmailStatus.DISPOSABLE: -50,
+}
+
+# Verification fields for a lead with no email address
+MISSING_EMAIL_DEFAULTS = {
+    'email_verified': False,
+    'email_status': 'missing',
+    'email_score': 0.0,
+    'mx_valid': False,
+    'smtp_valid': False,
+    'email_quality_boost': -20,
+}
+
+# Concurrent MailTester requests during --verify-emails
+VERIFY_CONCURRENCY = int(os.getenv('VERIFY_CONCURRENCY', '5'))
+
+# Redraw progress bars at most twice a second, so cache hits aren't slowed by terminal I/O
+PROGRESS_KWARGS = dict(mininterval=0.5, smoothing=0.1)
+
+
+def validate_environment():
+    """Validate required environment variables are present"""
+    required_vars = {
+        'APIFY_API_KEY': 'Apify API key for Google Maps scraping',
+        'OPENAI_API_KEY': 'OpenAI API key for lead scoring and email generation'
+    }
+    
+    missing = []
+    for var, description in required_vars.items():
+        if not os.getenv(var):
+            missing.append(f"{var} ({description})")
+    
+    # Google Drive no longer required - removed check
+    
+    if missing:
+        logger.error("Missing required configuration:")
+        for item in missing:
+            logger.error(f"  - {item}")
+        sys.exit(1)
+    
+    logger.info("All required environment variables validated")
+
+
+async def score_one(scorer: LeadScorer, client: AsyncOpenAI, lead: Dict[str, Any]) -> Tuple[Any, str]:
+    """Score a lead, applying its email quality boost; returns ('NA', 'Scoring failed') on error"""
+    try:
+        score, reasoning = await scorer.score_lead_async(lead, client)
+    except Exception as e:
+        logger.error(f"Failed to score lead {lead.get('Name', 'Unknown')}: {e}")
+        return 'NA', 'Scoring failed'
+    
+    # Apply email quality boost if email was verified
+    if 'email_quality_boost' in lead:
+        score = max(0, min(100, score + lead['email_quality_boost']))
+        if lead['email_quality_boost'] != 0:
+            reasoning += f" Email verification: {lead['email_status']} (score adjusted by {lead['email_quality_boost']:+d} points)."
+    return score, reasoning
+
+
+async def generate_one(email_gen: EmailGenerator, client: AsyncOpenAI, lead: Dict[str, Any]) -> str:
+    """Draft an email for a lead; returns 'Email generation failed' on error"""
+    try:
+        return await email_gen.generate_email_async(lead, client)
+    except Exception as e:
+        logger.error(f"Failed to generate email for {lead.get('Name', 'Unknown')}: {e}")
+        return 'Email generation failed'
+
+
+async def gather_bounded(func: Callable[[Dict[str, Any]], Awaitable[Any]], leads: List[Dict[str, Any]],
+                         desc: str, limit: int = SCORE_CONCURRENCY,
+                         on_result: Optional[Callable[[int, Any], None]] = None) -> List[Any]:
+    """
+    Run func over every lead with at most `limit` calls in flight; results keep lead order
+    
+    on_result(index, result) is called as each call finishes, in completion order.
+    Exceptions are returned (and passed to on_result) rather than raised.
+    """
+    semaphore = asyncio.Semaphore(limit)
+    with tqdm(total=len(leads), desc=desc, miniters=max(1, len(leads) // 100), **PROGRESS_KWARGS) as progress:
+        async def bounded(index, lead):
+            async with semaphore:
+                try:
+                    result = await func(lead)
+                except Exception as e:
+                    result = e
+            progress.update(1)
+            if on_result:
+                on_result(index, result)
+            return result
+        return await asyncio.gather(*(bounded(i, lead) for i, lead in enumerate(leads)))
+
+
+class OrderedRowWriter:
+    """csv.DictWriter that takes rows as they complete and writes them out in lead order"""
+    
+    def __init__(self, f, fieldnames: List[str]):
+        # Fields a lead doesn't have are written as 'NA'; fields not in the output are skipped
+        self._writer = csv.DictWriter(f, fieldnames=fieldnames, restval='NA', extrasaction='ignore')
+        self._writer.writeheader()
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._next = 0
+        self.rows_written = 0
+    
+    def add(self, index: int, row: Dict[str, Any]):
+        """Queue row number `index` and write every row that is now next in line"""
+        self._pending[index] = row
+        while self._next in self._pending:
+            self._writer.writerow(self._pending.pop(self._next))
+            self._next += 1
+            self.rows_written += 1
+
+
+async def process_lead(scorer: LeadScorer, email_gen: EmailGenerator, client: AsyncOpenAI,
+                       lead: Dict[str, Any]) -> Dict[str, Any]:
+    """Score a lead and draft its email in one pass, filling LeadScore, LeadScoreReasoning and DraftEmail"""
+    # The email prompt is built from the score
+    lead['LeadScore'], lead['LeadScoreReasoning'] = await score_one(scorer, client, lead)
+    lead['DraftEmail'] = await generate_one(email_gen, client, lead)
+    return lead
+
+
+async def score_and_draft(leads: List[Dict[str, Any]], industry: str,
+                          cache: Optional[CompletionCache] = None,
+                          on_row: Optional[Callable[[int, Dict[str, Any]], None]] = None):
+    """
+    Steps 3 and 4: score each lead and draft its email, overlapping the OpenAI round-trips
+    
+    Each lead goes through both steps before it is handed to on_row(index, lead), so its
+    row can be written without waiting for the rest of the leads to be scored.
+    
+    The AsyncOpenAI client is opened here and closed on the way out: its connection pool
+    belongs to the running event loop, so it must not outlive one asyncio.run call.
+    """
+    logger.info("Steps 3-4: Scoring leads and generating personalized emails with AI...")
+    scorer = get_scorer(industry, cache)
+    email_gen = get_email_generator(industry, cache)
+    
+    def finish(index, result):
+        lead = leads[index]
+        if isinstance(result, BaseException):
+            lead.setdefault('LeadScore', 'NA')
+            lead.setdefault('LeadScoreReasoning', 'Scoring failed')
+            lead['DraftEmail'] = 'Email generation failed'
+        if on_row:
+            on_row(index, lead)
+    
+    async with AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY')) as client:
+        await gather_bounded(lambda lead: process_lead(scorer, email_gen, client, lead), leads,
+                             "Processing leads", on_result=finish)
+
+
+def run(args: argparse.Namespace):
+    """Run the pipeline for parsed command line arguments"""
+    # Validate environment
+    validate_environment()
+    
+    logger.info(f"Starting R27 Infinite AI Leads Agent")
+    logger.info(f"Query: {args.query}")
+    logger.info(f"Limit: {args.limit}")
+    logger.info(f"Provider: {args.provider}")
+    logger.info(f"Industry: {args.industry}")
+    
+    try:
+        # Step 1: Fetch leads from provider
+        logger.info("Step 1: Fetching leads from provider...")
+        provider = get_provider(args.provider)
+        raw_leads = provider.fetch_places(args.query, args.limit)
+        logger.info(f"Fetched {len(raw_leads)} leads")
+        
+        if not raw_leads:
+            logger.error("No leads fetched. Exiting.")
+            sys.exit(1)
+        
+        # Step 2: Normalize data
+        logger.info("Step 2: Normalizing lead data...")
+        normalizer = DataNormalizer()
+        normalized_leads = normalizer.normalize(raw_leads)
+        logger.info(f"Normalized {len(normalized_leads)} leads")
+        
+        # Step 2.5: Email Verification (optional)
+        if args.verify_emails:
+            logger.info("Step 2.5: Verifying email addresses...")
+            
+            # Check for API key
+            if not os.getenv('MAILTESTER_API_KEY'):
+                logger.warning("MAILTESTER_API_KEY not found. Skipping email verification.")
+            else:
+                try:
+                    verifier = MailTesterVerifier()
+                    verified_leads = []
+                    
+                    # Verify every address concurrently first, then annotate the leads in one pass
+                    emails = [lead.get('Email', '').strip() for lead in normalized_leads]
+                    to_verify = [email for email in emails if email]
+                    with tqdm(total=len(set(to_verify)), desc="Verifying emails", **PROGRESS_KWARGS) as progress:
+                        results = verifier.verify_batch(to_verify, max_workers=VERIFY_CONCURRENCY,
+                                                        on_result=lambda _: progress.update(1))
+                    results_by_email = dict(zip(to_verify, results))
+                    
+                    for lead, email in zip(normalized_leads, emails):
+                        if email:
+                            result = results_by_email[email]
+                            
+                            # Add verification data to lead
+                            lead['email_verified'] = result.status == EmailStatus.VALID
+                            lead['email_status'] = result.status.value
+                            lead['email_score'] = result.score
+                            lead['mx_valid'] = result.mx_valid
+                            lead['smtp_valid'] = result.smtp_valid
+                            
+                            # Adjust lead score based on email validity
+                            lead['email_quality_boost'] = EMAIL_QUALITY_BOOST.get(result.status, 0)
+                        else:
+                            lead.update(MISSING_EMAIL_DEFAULTS)
+                        
+                        # Skip invalid emails if requested
+                        if args.skip_invalid_emails and lead['email_status'] in ['invalid', 'disposable', 'missing']:
+                            logger.info(f"Skipping lead with invalid email: {lead.get('Name', 'Unknown')}")
+                            continue
+                        
+                        verified_leads.append(lead)
+                    
+                    normalized_leads = verified_leads
+                    logger.info(f"Email verification complete. {len(normalized_leads)} leads remaining.")
+                    
+                    # Show verification stats
+                    valid_count = sum(1 for l in normalized_leads if l.get('email_verified', False))
+                    logger.info(f"Valid emails: {valid_count}/{len(normalized_leads)} ({valid_count*100/len(normalized_leads):.1f}%)")
+                    
+                except Exception as e:
+                    logger.error(f"Email verification failed: {e}", exc_info=True)
+                    logger.warning("Email verification service error - marking all emails as unverified")
+                    
+                    # Mark all leads as having verification errors
+                    for lead in normalized_leads:
+                        lead['email_verified'] = False
+                        lead['email_status'] = 'verification_error'
+                        lead['email_score'] = 0.0
+                        lead['mx_valid'] = False
+                        lead['smtp_valid'] = False
+                        lead['email_quality_boost'] = 0
+        
+        # Step 5 (set up first): the CSV is written row by row while emails are generated
+        # Ensure output directory exists
+        os.makedirs(args.output_dir, exist_ok=True)
+        
+        # Create filename
+        date_str = datetime.now().strftime('%Y-%m-%d')
+        safe_query = safe_query_filename(args.query)
+        filename = f"{date_str}_{safe_query}.csv"
+        filepath = os.path.join(args.output_dir, filename)
+        
+        # Exact column order
+        columns = ['Name', 'Address', 'Phone', 'Website', 'SocialMediaLinks', 
+                  'Reviews', 'Images', 'LeadScore', 'LeadScoreReasoning', 'DraftEmail']
+        
+        # Add email verification columns if verification was performed
+        if args.verify_emails and os.getenv('MAILTESTER_API_KEY'):
+            verification_columns = ['email_verified', 'email_status', 'email_score', 'mx_valid', 'smtp_valid']
+            columns = columns[:-1] + verification_columns + columns[-1:]  # Insert before DraftEmail
+        
+        # Steps 3-4: Score leads and generate personalized emails with AI, streaming rows to the CSV
+        cache = None if args.no_cache else default_cache()
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = OrderedRowWriter(f, columns)
+            asyncio.run(score_and_draft(normalized_leads, args.industry, cache, on_row=writer.add))
+        logger.info(f"CSV saved to: {filepath}")
+        
+        # Step 6: Done - CSV is saved locally
+        print(f"\n[SUCCESS] Your leads CSV is ready:")
+        print(f"Local file: {os.path.abspath(filepath)}")
+        
+        # Summary statistics
+        print(f"\nSummary:")
+        print(f"  Total leads: {writer.rows_written}")
+        
+        # Calculate average score if scores are numeric
+        try:
+            numeric_scores = [l['LeadScore'] for l in normalized_leads if isinstance(l['LeadScore'], (int, float))]
+            if numeric_scores:
+                avg_score = sum(numeric_scores) / len(numeric_scores)
+                print(f"  Average lead score: {avg_score:.1f}/10")
+        except:
+            pass
+        
+    except Exception as e:
+        logger.error(f"Fatal error in pipeline: {e}", exc_info=True)
+        sys.exit(1)
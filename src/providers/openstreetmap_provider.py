@@ -219,8 +219,8 @@ class OpenStreetMapProvider(BaseProvider):
                 'addressdetails': 1
             }
             
-            headers = {'User-Agent': 'R27LeadsAgent/1.0 (Business Directory)'}
-            response = requests.get(nominatim_url, params=params, headers=headers, timeout=10)
+            # Reuse the keep-alive session (and its User-Agent) rather than a fresh connection per lookup
+            response = self.session.get(nominatim_url, params=params, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if data and len(data) > 0:
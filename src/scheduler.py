@@ -216,6 +216,34 @@ class LeadScheduler:
         
         logger.info(f"Added to queue {queue_id}: {query} (verify={verify_emails}, generate={generate_emails})")
         return queue_id
+    
+    def add_many_to_queue(self, items: List[Dict]) -> List[int]:
+        """Add several searches to the queue in a single transaction
+        
+        Each item takes the same keys as add_to_queue's arguments. Returns the
+        new queue ids in the same order as items.
+        """
+        if not items:
+            return []
+            
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        queue_ids = []
+        for item in items:
+            cursor.execute('''
+                INSERT INTO search_queue (query, limit_leads, verify_emails, generate_emails, priority, schedule_id, scheduled_time)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (item['query'], item.get('limit_leads', 25), item.get('verify_emails', True),
+                  item.get('generate_emails', False), item.get('priority', 5),
+                  item.get('schedule_id'), item.get('scheduled_time')))
+            queue_ids.append(cursor.lastrowid)
+        
+        conn.commit()
+        conn.close()
+        
+        logger.info(f"Added {len(queue_ids)} items to queue")
+        return queue_ids
         
     def get_queue(self, status: str = None) -> List[Dict]:
         """Get items from the queue"""
@@ -249,6 +277,28 @@ class LeadScheduler:
         conn.close()
         return deleted
     
+    def cancel_queue_items(self, queue_ids: List[int]) -> int:
+        """Cancel several pending queue items with one statement"""
+        if not queue_ids:
+            return 0
+            
+        queue_ids = list(queue_ids)
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        count = 0
+        # Stay under SQLite's bound-parameter limit on older builds
+        for start in range(0, len(queue_ids), 500):
+            chunk = queue_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                DELETE FROM search_queue 
+                WHERE id IN ({placeholders}) AND status = 'pending'
+            ''', chunk)
+            count += cursor.rowcount
+        conn.commit()
+        conn.close()
+        return count
+    
     def clear_queue(self) -> int:
         """Clear all pending queue items"""
         conn = sqlite3.connect(self.db_path)
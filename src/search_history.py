@@ -5,16 +5,86 @@ Stores search history and favorite searches in SQLite database
 
 import sqlite3
 import json
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import os
 
+
+class SuggestionTrie:
+    """In-memory prefix trie of suggestion keywords with their frequency and last use"""
+    
+    def __init__(self):
+        self.root = {}
+        self._lock = threading.Lock()
+        # Locus of the previous lookup; typing one more character descends from here
+        self._last_prefix = None
+        self._last_node = None
+    
+    def add(self, keyword: str, frequency: int, last_used: str):
+        """Set the stats for a keyword, creating its path if needed"""
+        with self._lock:
+            node = self.root
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[None] = (keyword, frequency, last_used)
+    
+    def increment(self, keyword: str, last_used: str):
+        """Bump a keyword's frequency by one"""
+        with self._lock:
+            node = self.root
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            _, frequency, _ = node.get(None, (keyword, 0, last_used))
+            node[None] = (keyword, frequency + 1, last_used)
+    
+    def _locate(self, prefix: str) -> Optional[dict]:
+        if self._last_node is not None and prefix.startswith(self._last_prefix):
+            node, rest = self._last_node, prefix[len(self._last_prefix):]
+        else:
+            node, rest = self.root, prefix
+        for ch in rest:
+            node = node.get(ch)
+            if node is None:
+                return None
+        self._last_prefix, self._last_node = prefix, node
+        return node
+    
+    def search(self, prefix: str, limit: int) -> List[str]:
+        """Keywords starting with prefix, most frequent (then most recent) first"""
+        with self._lock:
+            node = self._locate(prefix)
+            if node is None:
+                return []
+            entries: List[Tuple[str, int, str]] = []
+            stack = [node]
+            while stack:
+                current = stack.pop()
+                for ch, child in current.items():
+                    if ch is None:
+                        entries.append(child)
+                    else:
+                        stack.append(child)
+        entries.sort(key=lambda e: (e[1], e[2] or ''), reverse=True)
+        return [keyword for keyword, _, _ in entries[:limit]]
+
+
 class SearchHistoryManager:
     def __init__(self, db_path: str = 'data/search_history.db'):
         """Initialize the search history manager with SQLite database"""
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self.db_path = db_path
         self.init_database()
+        self.suggestion_trie = SuggestionTrie()
+        self._load_suggestions()
+    
+    def _load_suggestions(self):
+        """Populate the in-memory suggestion trie from the database"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT keyword, frequency, last_used FROM search_suggestions')
+            for keyword, frequency, last_used in cursor.fetchall():
+                self.suggestion_trie.add(keyword, frequency, last_used)
     
     def init_database(self):
         """Create tables if they don't exist"""
@@ -61,8 +131,37 @@ class SearchHistoryManager:
                 )
             ''')
             
+            # Per-query search counts (for popular searches), kept in step with
+            # search_history so the top-N is an index read instead of a GROUP BY scan
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS search_counts (
+                    query TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    last_used DATETIME
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_search_counts_popular
+                ON search_counts (count DESC, last_used DESC)
+            ''')
+            
+            # Backfill counts for databases created before the table existed
+            cursor.execute('SELECT EXISTS (SELECT 1 FROM search_counts)')
+            if not cursor.fetchone()[0]:
+                self._rebuild_search_counts(cursor)
+            
             conn.commit()
     
+    def _rebuild_search_counts(self, cursor):
+        """Recompute search_counts from search_history"""
+        cursor.execute('DELETE FROM search_counts')
+        cursor.execute('''
+            INSERT INTO search_counts (query, count, last_used)
+            SELECT query, COUNT(*), MAX(timestamp)
+            FROM search_history
+            GROUP BY query
+        ''')
+    
     def add_search(self, query: str, limit_leads: int = 25, verify_emails: bool = True,
                    generate_emails: bool = False, export_verified_only: bool = False,
                    advanced_scraping: bool = False, results_count: int = 0):
@@ -77,26 +176,40 @@ class SearchHistoryManager:
             ''', (query, limit_leads, verify_emails, generate_emails,
                   export_verified_only, advanced_scraping, results_count))
             
-            # Update search suggestions
-            self._update_suggestions(query)
+            cursor.execute('''
+                INSERT INTO search_counts (query, count, last_used)
+                VALUES (?, 1, CURRENT_TIMESTAMP)
+                ON CONFLICT(query) DO UPDATE SET
+                count = count + 1,
+                last_used = excluded.last_used
+            ''', (query,))
+            
+            # Update search suggestions in the same transaction
+            keywords, now = self._update_suggestions(cursor, query)
             conn.commit()
+        
+        # Only count the search in memory once the database has it
+        for keyword in keywords:
+            self.suggestion_trie.increment(keyword, now)
     
-    def _update_suggestions(self, query: str):
-        """Update search suggestions based on query"""
+    def _update_suggestions(self, cursor, query: str) -> Tuple[List[str], str]:
+        """Update search suggestions based on query; returns the keywords stored and their timestamp"""
         # Extract keywords from query
         keywords = query.lower().split()
+        now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')  # Same format as CURRENT_TIMESTAMP
+        stored = []
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            for keyword in keywords:
-                if len(keyword) > 2:  # Only store keywords with 3+ characters
-                    cursor.execute('''
-                        INSERT INTO search_suggestions (keyword, frequency, last_used)
-                        VALUES (?, 1, CURRENT_TIMESTAMP)
-                        ON CONFLICT(keyword) DO UPDATE SET
-                        frequency = frequency + 1,
-                        last_used = CURRENT_TIMESTAMP
-                    ''', (keyword,))
+        for keyword in keywords:
+            if len(keyword) > 2:  # Only store keywords with 3+ characters
+                cursor.execute('''
+                    INSERT INTO search_suggestions (keyword, frequency, last_used)
+                    VALUES (?, 1, ?)
+                    ON CONFLICT(keyword) DO UPDATE SET
+                    frequency = frequency + 1,
+                    last_used = excluded.last_used
+                ''', (keyword, now))
+                stored.append(keyword)
+        return stored, now
     
     def get_history(self, limit: int = 50) -> List[Dict]:
         """Get recent search history"""
@@ -111,16 +224,8 @@ class SearchHistoryManager:
             return [dict(row) for row in cursor.fetchall()]
     
     def get_suggestions(self, prefix: str, limit: int = 10) -> List[str]:
-        """Get search suggestions based on prefix"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT keyword FROM search_suggestions
-                WHERE keyword LIKE ?
-                ORDER BY frequency DESC, last_used DESC
-                LIMIT ?
-            ''', (f'{prefix}%', limit))
-            return [row[0] for row in cursor.fetchall()]
+        """Get search suggestions based on prefix (served from the in-memory trie)"""
+        return self.suggestion_trie.search(prefix.lower(), limit)
     
     def add_favorite(self, name: str, query: str, limit_leads: int = 25,
                     verify_emails: bool = True, generate_emails: bool = False,
@@ -159,9 +264,8 @@ class SearchHistoryManager:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT query, COUNT(*) as count, MAX(timestamp) as last_used
-                FROM search_history
-                GROUP BY query
+                SELECT query, count, last_used
+                FROM search_counts
                 ORDER BY count DESC, last_used DESC
                 LIMIT ?
             ''', (limit,))
@@ -175,5 +279,8 @@ class SearchHistoryManager:
                 DELETE FROM search_history
                 WHERE timestamp < datetime('now', ? || ' days')
             ''', (-older_than_days,))
+            deleted = cursor.rowcount
+            if deleted:
+                self._rebuild_search_counts(cursor)
             conn.commit()
-            return cursor.rowcount
\ No newline at end of file
+            return deleted
\ No newline at end of file
@@ -3,12 +3,27 @@ Utility functions module.
 Contains common helper functions used throughout the application.
 """
 
+import io
 import os
 import re
+import sys
 import json
+import time
 import logging
+import zipfile
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+
+# Result files are read with PyArrow's multi-threaded CSV and Parquet readers when available
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +57,24 @@ def sanitize_filename(filename: str, max_length: int = 100) -> str:
     return sanitized.strip('_')
 
 
+# Spaces become underscores, commas are dropped, and characters Windows rejects in filenames become underscores
+_QUERY_FILENAME_TABLE = str.maketrans({' ': '_', ',': None, **{ch: '_' for ch in '<>:"/\\|?*'}})
+
+
+def safe_query_filename(query: str, max_length: int = 50) -> str:
+    """
+    Turn a search query into a filename fragment in a single pass.
+    
+    Args:
+        query: Search query, e.g. "dentists in Miami, FL"
+        max_length: Maximum length of the result
+    
+    Returns:
+        Filename-safe fragment, e.g. "dentists_in_Miami_FL"
+    """
+    return query.translate(_QUERY_FILENAME_TABLE)[:max_length]
+
+
 def generate_timestamp_filename(prefix: str, extension: str = 'csv') -> str:
     """
     Generate a filename with timestamp.
@@ -347,6 +380,298 @@ def format_duration(seconds: float) -> str:
         return f"{hours:.1f}h"
 
 
+def write_dataframe_csv(df: Any, path: str) -> None:
+    """
+    Write a DataFrame to CSV without the index.
+    
+    Uses PyArrow's multi-threaded C++ writer when pyarrow is installed,
+    falling back to ``DataFrame.to_csv`` if it isn't or if a column has
+    mixed types Arrow can't represent.
+    
+    Args:
+        df: pandas DataFrame to write
+        path: Output file path
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        df.to_csv(path, index=False)
+        return
+    
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        logger.debug(f"Falling back to pandas CSV writer for {path}: {e}")
+        df.to_csv(path, index=False)
+        return
+    pacsv.write_csv(table, path)
+
+
+def parquet_sidecar_path(csv_path: str) -> str:
+    """
+    Path of the Parquet copy kept next to a result CSV.
+    
+    Args:
+        csv_path: Path of the CSV file
+    
+    Returns:
+        The same path with a .parquet extension
+    """
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+# No null markers at all - the pyarrow equivalent of pandas' keep_default_na=False,
+# so an empty field reads back as '' and a literal 'NA' stays a string
+RESULT_CSV_CONVERT_OPTIONS = (pacsv.ConvertOptions(null_values=[], strings_can_be_null=False)
+                              if PYARROW_AVAILABLE else None)
+
+
+def write_parquet_sidecar(csv_path: str) -> Optional[str]:
+    """
+    Write a snappy-compressed Parquet copy of a result CSV next to it.
+    
+    The CSV stays the user-facing file; the Parquet copy is a typed, columnar
+    cache for code that re-reads results. It is built by parsing the CSV with
+    the same options read_verified_leads uses, so both files read back as the
+    same values (empty fields are '', not NaN). Skipped when pyarrow isn't
+    installed or the CSV can't be parsed by Arrow.
+    
+    Args:
+        csv_path: Path of the CSV file
+    
+    Returns:
+        Path of the Parquet file, or None if it wasn't written
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+    
+    path = parquet_sidecar_path(csv_path)
+    try:
+        table = pacsv.read_csv(csv_path, convert_options=RESULT_CSV_CONVERT_OPTIONS)
+        pq.write_table(table, path, compression='snappy')
+    except (pa.ArrowException, OSError) as e:
+        logger.debug(f"Skipping Parquet copy of {csv_path}: {e}")
+        return None
+    return path
+
+
+VERIFIED_MASK_COLUMNS = frozenset({'Email', 'Email_Status', 'Email_Verified'})
+VERIFIED_FLAGS = frozenset({'true', '1', 'yes'})
+
+
+def verified_email_mask(df: Any) -> Any:
+    """Rows with a usable email that is marked valid or verified - the only leads sent to Instantly"""
+    passed = pd.Series(False, index=df.index)
+    if 'Email' not in df.columns:
+        return passed
+    
+    # Only run the string kernels for verification columns that are actually present
+    if 'Email_Status' in df.columns:
+        passed |= df['Email_Status'].fillna('').astype(str).str.lower().eq('valid')
+    if 'Email_Verified' in df.columns:
+        passed |= df['Email_Verified'].fillna('').astype(str).str.lower().isin(VERIFIED_FLAGS)
+    if not passed.any():
+        return passed
+    
+    emails = df['Email'].fillna('').astype(str).str.strip()
+    return passed & emails.ne('') & emails.ne('NA')
+
+
+def _read_verified_leads_arrow(result_file: str, columns=None, limit: Optional[int] = None,
+                               block_size: int = 16 << 20) -> List[Dict]:
+    """read_verified_leads on PyArrow's multi-threaded streaming CSV reader"""
+    filtered = []
+    with pacsv.open_csv(result_file, read_options=pacsv.ReadOptions(block_size=block_size),
+                        convert_options=RESULT_CSV_CONVERT_OPTIONS) as reader:
+        if columns is not None:
+            keep = [name for name in reader.schema.names if name in columns]
+        for batch in reader:
+            if columns is not None:
+                batch = batch.select(keep)
+            chunk = batch.to_pandas()
+            filtered.extend(chunk[verified_email_mask(chunk)].to_dict(orient='records'))
+            if limit is not None and len(filtered) >= limit:
+                break
+    return filtered[:limit]
+
+
+def _blank_text_nulls(df: Any) -> Any:
+    """Missing values in text columns as '', like the CSV readers return them"""
+    # Parquet copies written before they were built from the CSV kept pandas' NaN
+    for name in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[name]) and df[name].isna().any():
+            df[name] = df[name].fillna('')
+    return df
+
+
+def _read_verified_leads_parquet(parquet_file: str, columns=None, limit: Optional[int] = None) -> List[Dict]:
+    """read_verified_leads over a result file's Parquet copy, loading only the wanted columns"""
+    if columns is not None:
+        columns = [name for name in pq.read_schema(parquet_file).names if name in columns]
+    if limit is None:
+        df = _blank_text_nulls(pq.read_table(parquet_file, columns=columns).to_pandas())
+        return df[verified_email_mask(df)].to_dict(orient='records')
+    
+    filtered = []
+    for batch in pq.ParquetFile(parquet_file).iter_batches(columns=columns):
+        chunk = _blank_text_nulls(batch.to_pandas())
+        filtered.extend(chunk[verified_email_mask(chunk)].to_dict(orient='records'))
+        if len(filtered) >= limit:
+            break
+    return filtered[:limit]
+
+
+def read_verified_leads(result_file: str, columns=None, chunksize: int = 50000,
+                        limit: Optional[int] = None) -> List[Dict]:
+    """
+    Read a job's result CSV in chunks, keeping only rows that pass verified_email_mask.
+    
+    The Parquet copy next to the CSV is read instead when it isn't older than the CSV;
+    both give the same records.
+    
+    Args:
+        result_file: Path of the result CSV
+        columns: Columns to keep (plus the ones the mask needs), so wide result files
+            don't turn into one large dict per surviving row
+        chunksize: Rows per chunk for the pandas reader
+        limit: Stop once this many verified rows have been found
+    
+    Returns:
+        One dict per verified row
+    """
+    if columns is not None:
+        columns = frozenset(columns) | VERIFIED_MASK_COLUMNS
+    if PYARROW_AVAILABLE:
+        # Prefer the Parquet copy written alongside the CSV, as long as it isn't older
+        parquet_file = parquet_sidecar_path(result_file)
+        try:
+            if os.stat(parquet_file).st_mtime_ns >= os.stat(result_file).st_mtime_ns:
+                return _read_verified_leads_parquet(parquet_file, columns, limit)
+        except FileNotFoundError:
+            pass
+        except pa.ArrowException as e:
+            logger.debug(f"Ignoring unreadable Parquet copy {parquet_file}: {e}")
+        try:
+            return _read_verified_leads_arrow(result_file, columns, limit)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            # Column types are inferred from the first block; a later block can disagree
+            logger.debug(f"Falling back to pandas CSV reader for {result_file}: {e}")
+    
+    filtered = []
+    # Preserve literal 'NA' strings so they don't become NaN in JSON payloads
+    usecols = columns.__contains__ if columns is not None else None
+    for chunk in pd.read_csv(result_file, keep_default_na=False, chunksize=chunksize, usecols=usecols):
+        filtered.extend(chunk[verified_email_mask(chunk)].to_dict(orient='records'))
+        if limit is not None and len(filtered) >= limit:
+            break
+    return filtered[:limit]
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """Write-only, unseekable sink that hands back whatever zipfile has written so far"""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+# Formats that are already compressed; deflating them again only burns CPU
+PRECOMPRESSED_EXTENSIONS = frozenset({'.gz', '.zip', '.parquet', '.xlsx', '.bz2', '.xz'})
+
+
+def set_zip_compress_level(zinfo: zipfile.ZipInfo, compresslevel: int) -> None:
+    """Set the deflate level ZipFile.open() uses for a ZipInfo we built ourselves"""
+    # ZipFile's compresslevel only applies to entries it creates; Python 3.13 renamed the attribute
+    if sys.version_info >= (3, 13):
+        zinfo.compress_level = compresslevel
+    else:
+        zinfo._compresslevel = compresslevel
+
+
+def stream_zip(entries: Iterable[Tuple[str, str, os.stat_result]], block_size: int = 1 << 16,
+               compresslevel: int = 1) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive chunk by chunk, without a temp file.
+    
+    Args:
+        entries: (path, arcname, stat_result) for each file to add
+        block_size: Bytes read from each file at a time
+        compresslevel: Deflate level for files that aren't already compressed
+    
+    Yields:
+        Non-empty byte chunks that together form the archive
+    """
+    sink = _ZipStreamBuffer()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+        for path, arcname, st in entries:
+            # Same header ZipInfo.from_file builds, from the stat we already have
+            zinfo = zipfile.ZipInfo(arcname, time.localtime(st.st_mtime)[:6])
+            zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+            zinfo.file_size = st.st_size
+            if os.path.splitext(path)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+                zinfo.compress_type = zipfile.ZIP_STORED
+            else:
+                # Level 1 deflate is several times faster than the default 6 for ~10% larger CSVs
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                set_zip_compress_level(zinfo, compresslevel)
+            with open(path, 'rb') as src, zf.open(zinfo, 'w') as dst:
+                for block in iter(lambda: src.read(block_size), b''):
+                    dst.write(block)
+                    data = sink.take()
+                    if data:
+                        yield data
+            data = sink.take()
+            if data:
+                yield data
+    # Central directory
+    data = sink.take()
+    if data:
+        yield data
+
+
+def tail_lines(path: str, count: int = 50, window: int = 16384) -> List[str]:
+    """
+    Read the last lines of a text file without loading the whole file.
+    
+    Args:
+        path: Path to the file
+        count: Number of trailing lines to return
+        window: Initial number of bytes to read from the end of the file
+    
+    Returns:
+        Up to ``count`` trailing lines, without line endings
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        
+        # Keep doubling the window until it holds enough lines or reaches the start of the file
+        while True:
+            start = max(0, size - window)
+            f.seek(start)
+            lines = f.read().decode('utf-8', 'replace').splitlines()
+            if start == 0 or len(lines) > count:
+                break
+            window *= 2
+    
+    # The first line is usually cut mid-way when we didn't start at offset 0
+    if start > 0 and lines:
+        lines = lines[1:]
+    return lines[-count:]
+
+
 class RateLimiter:
     """Simple rate limiter for API calls"""
     
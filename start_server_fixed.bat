@@ -4,9 +4,14 @@ echo Starting R27 Infinite AI Leads Agent (FIXED)
 echo ===============================================
 echo.
 
-REM Kill any existing Python processes
+REM Stop the previous server by its PID file; other Python processes are left alone
 echo Cleaning up old processes...
-powershell -Command "Get-Process python* 2>$null | Stop-Process -Force 2>$null"
+if exist .server.pid (
+    for /f %%p in (.server.pid) do taskkill /F /PID %%p /FI "IMAGENAME eq python*" 2>nul
+    del .server.pid 2>nul
+) else (
+    echo No .server.pid found, so no previous server to stop.
+)
 timeout /t 2 /nobreak >nul
 
 REM Clear Python cache
@@ -0,0 +1,64 @@
+"""
+Helpers for tests that talk to a live Flask server.
+
+Starts app.py (or reuses one already listening on SERVER_PORT) and waits for it
+to answer instead of sleeping a fixed amount of time.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import requests
+
+# Same variable app.py reads for its port
+SERVER_PORT = int(os.getenv('FLASK_RUN_PORT', '5001'))
+BASE_URL = f"http://localhost:{SERVER_PORT}"
+READY_URL = f"{BASE_URL}/api/routes"
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+def server_is_up():
+    """True if the Flask server is answering"""
+    try:
+        return requests.get(READY_URL, timeout=1).status_code == 200
+    except requests.RequestException:
+        return False
+
+
+def wait_for_server(timeout=10.0, interval=0.1, proc=None):
+    """Poll the server until it answers, the process dies, or timeout runs out"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server_is_up():
+            return True
+        if proc is not None and proc.poll() is not None:
+            return False
+        time.sleep(interval)
+    return False
+
+
+@contextmanager
+def running_server(timeout=10.0):
+    """Start app.py unless a server is already up, and stop it afterwards"""
+    if server_is_up():
+        yield BASE_URL
+        return
+
+    proc = subprocess.Popen([sys.executable, APP_PATH],
+                            cwd=os.path.dirname(APP_PATH),
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_server(timeout, proc=proc):
+            raise RuntimeError(f"Flask server did not come up within {timeout:.0f}s")
+        yield BASE_URL
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
@@ -0,0 +1,77 @@
+"""
+ApolloLeadProcessor email generation across repeated runs in one process
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from src import apollo_lead_processor
+
+
+class FakeAsyncOpenAI:
+    """AsyncOpenAI stand-in that, like httpx's pool, only works on the loop it was first used in"""
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.loop = None
+        self.closed = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        FakeAsyncOpenAI.instances.append(self)
+
+    async def _create(self, **request):
+        loop = asyncio.get_running_loop()
+        if self.closed or (self.loop is not None and self.loop is not loop):
+            raise RuntimeError("Event loop is closed")
+        self.loop = loop
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Drafted email."))])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setattr(apollo_lead_processor, 'AsyncOpenAI', FakeAsyncOpenAI)
+    FakeAsyncOpenAI.instances = []
+    return apollo_lead_processor.ApolloLeadProcessor()
+
+
+@pytest.fixture
+def apollo_csv(tmp_path):
+    path = tmp_path / 'apollo.csv'
+    pd.DataFrame([
+        {'first_name': 'Ann', 'title': 'CEO', 'organization_name': 'Acme', 'email': 'ann@acme.com',
+         'estimated_num_employees': 40, 'organization_founded_year': 2015, 'industry': 'logistics',
+         'organization_short_description': 'Nationwide freight brokerage'},
+        {'first_name': 'Bob', 'title': 'Operations Manager', 'organization_name': 'Beta', 'email': 'bob@beta.com',
+         'estimated_num_employees': 12, 'organization_founded_year': 2020, 'industry': 'retail',
+         'organization_short_description': 'Family owned hardware store'},
+    ]).to_csv(path, index=False)
+    return str(path)
+
+
+def test_process_apollo_csv_twice_uses_a_fresh_client(processor, apollo_csv):
+    first = processor.process_apollo_csv(apollo_csv)
+    second = processor.process_apollo_csv(apollo_csv)
+
+    assert list(first['personalized_email']) == ['Drafted email.', 'Drafted email.']
+    assert list(second['personalized_email']) == ['Drafted email.', 'Drafted email.']
+    assert len(FakeAsyncOpenAI.instances) == 2
+    assert all(client.closed for client in FakeAsyncOpenAI.instances)
+
+
+def test_process_apollo_csv_inside_running_loop(processor, apollo_csv):
+    async def caller():
+        return processor.process_apollo_csv(apollo_csv)
+
+    results = asyncio.run(caller())
+
+    assert list(results['personalized_email']) == ['Drafted email.', 'Drafted email.']
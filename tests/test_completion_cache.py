@@ -0,0 +1,77 @@
+"""
+CompletionCache and its use from the async scoring and drafting coroutines
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.completion_cache import CompletionCache
+from src.email_generator import EmailGenerator
+from src.lead_scorer import LeadScorer
+
+
+class ThreadRecordingCache(CompletionCache):
+    """CompletionCache that notes which thread each SQLite call ran on"""
+
+    def __init__(self, db_path):
+        super().__init__(db_path)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, content):
+        self.threads.append(threading.get_ident())
+        super().set(key, content)
+
+
+class FakeAsyncOpenAI:
+    def __init__(self, content):
+        self.calls = 0
+
+        async def create(**request):
+            self.calls += 1
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    return ThreadRecordingCache(str(tmp_path / 'data' / 'completion_cache.db'))
+
+
+def test_get_and_set_round_trip(cache):
+    key = cache.key_for({'model': 'gpt-3.5-turbo', 'messages': [{'role': 'user', 'content': 'hi'}]})
+
+    assert cache.get(key) is None
+    cache.set(key, 'hello')
+    assert cache.get(key) == 'hello'
+    assert asyncio.run(cache.get_async(key)) == 'hello'
+    assert cache.clear() == 1
+
+
+def test_async_lookups_run_off_the_event_loop(cache):
+    lead = {'Name': 'Acme Plumbing', 'Rating': 4.5, 'Reviews': 12}
+    scorer = LeadScorer(cache=cache)
+    generator = EmailGenerator(cache=cache)
+    client = FakeAsyncOpenAI('SCORE: 7\nREASONING: Slow site')
+
+    async def run_twice():
+        loop_thread = threading.get_ident()
+        for _ in range(2):
+            await scorer.score_lead_async(lead, client)
+            await generator.generate_email_async(lead, client)
+        return loop_thread
+
+    loop_thread = asyncio.run(run_twice())
+
+    # The second pass is served from the cache
+    assert client.calls == 2
+    assert len(cache.threads) == 6
+    assert loop_thread not in cache.threads
@@ -0,0 +1,31 @@
+"""
+debug_server's /api/logs endpoint
+"""
+
+import pytest
+
+import debug_server
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # The endpoint reads logs/flask_app.log relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return debug_server.app.test_client()
+
+
+def test_logs_returns_last_100_lines(client, tmp_path):
+    (tmp_path / 'logs').mkdir()
+    (tmp_path / 'logs' / 'flask_app.log').write_text(''.join(f'entry {i}  \n' for i in range(500)))
+
+    data = client.get('/api/logs').get_json()
+
+    assert data['log_count'] == 100
+    assert data['recent_logs'][0] == 'entry 400'
+    assert data['recent_logs'][-1] == 'entry 499'
+
+
+def test_logs_without_log_file(client):
+    data = client.get('/api/logs').get_json()
+
+    assert data['recent_logs'] == ["Log file not found - app may not be running"]
@@ -0,0 +1,98 @@
+"""
+Instantly lead conversion and import helpers, with the API calls replaced by recorders
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src.instantly_integration import InstantlyIntegration, InstantlyLead, converted_leads_for
+
+
+@pytest.fixture
+def result_csv(tmp_path):
+    path = tmp_path / 'leads.csv'
+    pd.DataFrame({
+        'Name': ['Acme Plumbing', 'Beta Dental'],
+        'Email': ['ann@acme.com', 'bob@beta.com'],
+        'Email_Status': ['valid', 'invalid'],
+        'Phone': ['(512) 555-0100', ''],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def test_converted_leads_for_returns_fresh_objects(result_csv):
+    first = converted_leads_for(result_csv)
+    first[0].email = 'changed@acme.com'
+    second = converted_leads_for(result_csv)
+
+    assert [lead.email for lead in second] == ['ann@acme.com']
+    assert second[0] is not first[0]
+    assert second[0].company_name == 'Acme Plumbing'
+
+
+def test_converted_leads_for_rereads_a_rewritten_file(result_csv):
+    assert len(converted_leads_for(result_csv)) == 1
+
+    pd.DataFrame({'Name': ['Gamma'], 'Email': ['cy@gamma.com'], 'Email_Status': ['valid']}).to_csv(result_csv, index=False)
+    st = os.stat(result_csv)
+    os.utime(result_csv, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert [lead.email for lead in converted_leads_for(result_csv)] == ['cy@gamma.com']
+
+
+def test_converted_leads_for_empty_file(tmp_path):
+    path = tmp_path / 'empty.csv'
+    path.write_text('')
+
+    assert converted_leads_for(str(path)) == ()
+
+
+@pytest.fixture
+def instantly(monkeypatch):
+    client = InstantlyIntegration('test-key')
+    client.sent = []
+
+    def add_leads_to_campaign(campaign_id, leads):
+        client.sent.extend(leads)
+        return {'success': True, 'added': len(leads), 'failed': 0, 'skipped_duplicates': 0}
+
+    monkeypatch.setattr(client, 'add_leads_to_campaign', add_leads_to_campaign)
+    return client
+
+
+def test_add_leads_in_slices_drops_cross_slice_duplicates(instantly):
+    leads = [InstantlyLead(email='a@example.com'), InstantlyLead(email='b@example.com'),
+             InstantlyLead(email=' A@Example.com ')]
+
+    result = instantly.add_leads_in_slices('campaign', leads, slice_size=1)
+
+    assert [lead.email for lead in instantly.sent] == ['a@example.com', 'b@example.com']
+    assert result['added'] == 2
+    assert result['failed_slices'] == []
+
+
+def test_add_leads_in_slices_keeps_leads_without_email(instantly):
+    leads = [InstantlyLead(email='', first_name='Ann'), InstantlyLead(email=None, first_name='Bob'),
+             InstantlyLead(email='  ', first_name='Cy')]
+
+    instantly.add_leads_in_slices('campaign', leads, slice_size=2)
+
+    assert [lead.first_name for lead in instantly.sent] == ['Ann', 'Bob', 'Cy']
+
+
+def test_add_leads_in_slices_reports_failed_slice_range(instantly, monkeypatch):
+    def add_leads_to_campaign(campaign_id, leads):
+        if leads[0].email == 'c@example.com':
+            raise RuntimeError('rate limited')
+        return {'success': True, 'added': len(leads)}
+
+    monkeypatch.setattr(instantly, 'add_leads_to_campaign', add_leads_to_campaign)
+    leads = [InstantlyLead(email=f'{name}@example.com') for name in 'abcd']
+
+    result = instantly.add_leads_in_slices('campaign', leads, slice_size=2)
+
+    assert result['added'] == 2
+    assert result['failed'] == 2
+    assert result['failed_slices'] == [{'start': 2, 'end': 4, 'error': 'rate limited'}]
@@ -0,0 +1,137 @@
+"""
+process_spreadsheets on both its PyArrow and pandas paths
+"""
+
+import pandas as pd
+import pytest
+
+import process_spreadsheets
+
+RAW_CSV = """name,phone,title,email,organization_name
+Ann,007,CEO,ann@acme.com,Acme
+Bob,123,CTO,bob@beta.com,Beta
+Ann Again,008,CEO,ann@acme.com,Acme
+Cy,456,COO,cy@gamma.com,Gamma
+Dee,,VP,,Delta
+Eve,789,CFO,eve@eta.com,Eta
+"""
+
+VERIFIED_CSV = """Exported by verifier
+Date: 2024-01-01
+Total: 4
+
+email,name,domain,mx,status,result
+ann@acme.com,Ann,acme.com,mx.acme.com,ok,deliverable
+bob@beta.com,Bob,beta.com,mx.beta.com,invalid,undeliverable
+eve@eta.com,Eve,eta.com,mx.eta.com,ok,deliverable
+nobody@zeta.com,Nobody,zeta.com,mx.zeta.com,ok,deliverable
+"""
+
+RAW_COLUMNS = ['name', 'phone', 'title', 'email', 'organization_name']
+
+
+@pytest.fixture
+def spreadsheets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'raw.csv').write_text(RAW_CSV)
+    (tmp_path / 'verified.csv').write_text(VERIFIED_CSV)
+    return tmp_path
+
+
+def use_path(monkeypatch, use_pyarrow, write_parquet):
+    if use_pyarrow:
+        pytest.importorskip('pyarrow')
+    monkeypatch.setattr(process_spreadsheets, 'PYARROW_AVAILABLE', use_pyarrow)
+    monkeypatch.setattr(process_spreadsheets, 'WRITE_PARQUET', write_parquet)
+
+
+def read_output(directory, parquet):
+    if parquet:
+        return pd.read_parquet(directory / 'raw_cleaned.parquet')
+    return pd.read_csv(directory / 'raw_cleaned.csv', dtype=str, keep_default_na=False)
+
+
+def test_writes_parquet(spreadsheets, monkeypatch):
+    use_path(monkeypatch, use_pyarrow=True, write_parquet=True)
+
+    assert process_spreadsheets.process_spreadsheets() == 2
+
+    cleaned = read_output(spreadsheets, parquet=True)
+    assert list(cleaned.columns) == RAW_COLUMNS
+    assert cleaned['name'].tolist() == ['Ann', 'Eve']
+    # Every column is read as text, so leading zeros survive
+    assert cleaned['phone'].tolist() == ['007', '789']
+
+
+@pytest.mark.parametrize('use_pyarrow, write_parquet', [
+    (True, True),
+    (True, False),
+    (False, False),
+], ids=['pyarrow-parquet', 'pyarrow-csv', 'pandas-csv'])
+def test_raw_csv_without_rows_still_writes_output(spreadsheets, monkeypatch, use_pyarrow, write_parquet):
+    use_path(monkeypatch, use_pyarrow, write_parquet)
+    (spreadsheets / 'raw.csv').write_text(RAW_CSV.splitlines()[0] + '\n')
+
+    assert process_spreadsheets.process_spreadsheets() == 0
+
+    cleaned = read_output(spreadsheets, write_parquet)
+    assert list(cleaned.columns) == RAW_COLUMNS
+    assert cleaned.empty
+
+
+def test_writes_csv_with_arrow_writer(spreadsheets, monkeypatch):
+    use_path(monkeypatch, use_pyarrow=True, write_parquet=False)
+    (spreadsheets / 'raw.csv').write_text(RAW_CSV + 'Fay,321,"Owner, Founder",fay@eta.com,"Eta, Inc"\n')
+    (spreadsheets / 'verified.csv').write_text(VERIFIED_CSV + 'fay@eta.com,Fay,eta.com,mx.eta.com,ok,deliverable\n')
+
+    assert process_spreadsheets.process_spreadsheets() == 3
+
+    cleaned = read_output(spreadsheets, parquet=False)
+    assert list(cleaned.columns) == RAW_COLUMNS
+    assert cleaned['phone'].tolist() == ['007', '789', '321']
+    # Fields containing the delimiter come back intact
+    assert cleaned.iloc[-1]['title'] == 'Owner, Founder'
+    assert cleaned.iloc[-1]['organization_name'] == 'Eta, Inc'
+
+
+def test_writes_csv_with_pandas(spreadsheets, monkeypatch):
+    use_path(monkeypatch, use_pyarrow=False, write_parquet=False)
+
+    assert process_spreadsheets.process_spreadsheets() == 2
+
+    cleaned = read_output(spreadsheets, parquet=False)
+    assert list(cleaned.columns) == RAW_COLUMNS
+    assert cleaned['name'].tolist() == ['Ann', 'Eve']
+    assert cleaned['phone'].tolist() == ['007', '789']
+
+
+def collect_cleaned_chunks(path, verified, use_pyarrow):
+    columns = process_spreadsheets.read_csv_header(str(path))
+    rows_read = 0
+    names = []
+    for count, chunk in process_spreadsheets.iter_cleaned_chunks(str(path), verified, columns):
+        rows_read += count
+        names += chunk.column('name').to_pylist() if use_pyarrow else chunk['name'].tolist()
+    return rows_read, names
+
+
+def test_pandas_chunks_dedupe_across_chunks(spreadsheets, monkeypatch):
+    monkeypatch.setattr(process_spreadsheets, 'PYARROW_AVAILABLE', False)
+    monkeypatch.setattr(process_spreadsheets, 'RAW_CHUNK_ROWS', 1)
+
+    rows_read, names = collect_cleaned_chunks(spreadsheets / 'raw.csv', ['ann@acme.com', 'cy@gamma.com'], False)
+
+    assert rows_read == 6
+    assert names == ['Ann', 'Cy']
+
+
+def test_arrow_batches_dedupe_across_batches(spreadsheets, monkeypatch):
+    pa = pytest.importorskip('pyarrow')
+    monkeypatch.setattr(process_spreadsheets, 'PYARROW_AVAILABLE', True)
+    # A tiny block size splits the file into several record batches
+    monkeypatch.setattr(process_spreadsheets, 'CSV_BLOCK_SIZE', 64)
+
+    rows_read, names = collect_cleaned_chunks(spreadsheets / 'raw.csv', pa.array(['ann@acme.com', 'cy@gamma.com']), True)
+
+    assert rows_read == 6
+    assert names == ['Ann', 'Cy']
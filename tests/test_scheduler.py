@@ -0,0 +1,53 @@
+"""
+LeadScheduler batch queue inserts and deletes
+"""
+
+import pytest
+
+from add_generate_emails_column import migrate_database
+from src.scheduler import LeadScheduler
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    # migrate_database works on data/scheduler.db under the current directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    scheduler = LeadScheduler(db_path='data/scheduler.db')
+    migrate_database()
+    return scheduler
+
+
+def test_add_many_to_queue_returns_ids_in_item_order(scheduler):
+    ids = scheduler.add_many_to_queue([
+        {'query': 'plumbers in Austin'},
+        {'query': 'dentists in Denver', 'limit_leads': 50, 'priority': 9, 'generate_emails': True},
+    ])
+
+    queue = {item['id']: item for item in scheduler.get_queue()}
+    assert len(ids) == 2
+    assert queue[ids[0]]['query'] == 'plumbers in Austin'
+    assert queue[ids[0]]['limit_leads'] == 25
+    assert queue[ids[1]]['query'] == 'dentists in Denver'
+    assert queue[ids[1]]['priority'] == 9
+    assert queue[ids[1]]['generate_emails'] == 1
+
+
+def test_add_many_to_queue_empty(scheduler):
+    assert scheduler.add_many_to_queue([]) == []
+
+
+def test_cancel_queue_items_only_deletes_pending(scheduler):
+    ids = scheduler.add_many_to_queue([{'query': f'query {i}'} for i in range(3)])
+    scheduler.update_queue_item(ids[0], 'processing')
+
+    assert scheduler.cancel_queue_items(ids) == 2
+    assert [item['id'] for item in scheduler.get_queue()] == [ids[0]]
+
+
+def test_cancel_queue_items_spans_parameter_chunks(scheduler):
+    ids = scheduler.add_many_to_queue([{'query': f'query {i}'} for i in range(1200)])
+
+    assert scheduler.cancel_queue_items(ids + [ids[-1] + 1]) == 1200
+    assert scheduler.get_queue() == []
+    assert scheduler.cancel_queue_items([]) == 0
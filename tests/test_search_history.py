@@ -0,0 +1,114 @@
+"""
+Search suggestions trie and the search history tables behind it
+"""
+
+import sqlite3
+
+import pytest
+
+from src import search_history
+from src.search_history import SearchHistoryManager, SuggestionTrie
+
+
+@pytest.fixture
+def history(tmp_path):
+    return SearchHistoryManager(db_path=str(tmp_path / 'data' / 'search_history.db'))
+
+
+def test_trie_orders_by_frequency_then_recency():
+    trie = SuggestionTrie()
+    trie.add('plumber', 2, '2024-01-01 00:00:00')
+    trie.add('plumbing', 2, '2024-02-01 00:00:00')
+    trie.add('pizza', 5, '2024-01-01 00:00:00')
+
+    assert trie.search('p', 10) == ['pizza', 'plumbing', 'plumber']
+    assert trie.search('plum', 1) == ['plumbing']
+    assert trie.search('x', 10) == []
+
+
+def test_trie_search_after_narrower_then_wider_prefix():
+    trie = SuggestionTrie()
+    trie.add('dentist', 1, '')
+    trie.add('denver', 1, '')
+    trie.add('doctor', 1, '')
+
+    # Each lookup resumes from the previous prefix when it extends it
+    assert sorted(trie.search('den', 10)) == ['dentist', 'denver']
+    assert trie.search('dent', 10) == ['dentist']
+    assert sorted(trie.search('d', 10)) == ['dentist', 'denver', 'doctor']
+
+
+def test_trie_increment_creates_and_bumps():
+    trie = SuggestionTrie()
+    trie.increment('roofer', '2024-01-01 00:00:00')
+    trie.increment('roofer', '2024-01-02 00:00:00')
+    trie.add('roofing', 1, '2024-01-03 00:00:00')
+
+    assert trie.search('roof', 10) == ['roofer', 'roofing']
+
+
+def test_suggestions_follow_searches_and_survive_reload(history):
+    history.add_search('Plumbers in Austin')
+    history.add_search('plumbers near Dallas')
+
+    assert history.get_suggestions('PLU') == ['plumbers']
+    assert history.get_suggestions('a') == ['austin']
+    # Keywords of two characters or fewer are not suggested
+    assert history.get_suggestions('in') == []
+
+    reloaded = SearchHistoryManager(db_path=history.db_path)
+    assert reloaded.get_suggestions('plu') == ['plumbers']
+
+
+def test_failed_commit_leaves_suggestions_untouched(history, monkeypatch):
+    connect = sqlite3.connect
+
+    class FailingCommit:
+        def __init__(self, *args, **kwargs):
+            self._conn = connect(*args, **kwargs)
+
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+
+        def __enter__(self):
+            self._conn.__enter__()
+            return self
+
+        def __exit__(self, *exc):
+            return self._conn.__exit__(*exc)
+
+        def commit(self):
+            raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(search_history.sqlite3, 'connect', FailingCommit)
+    with pytest.raises(sqlite3.OperationalError):
+        history.add_search('roofers in Reno')
+    monkeypatch.undo()
+
+    assert history.get_suggestions('roo') == []
+    assert SearchHistoryManager(db_path=history.db_path).get_suggestions('roo') == []
+
+
+def test_popular_searches_counted_per_query(history):
+    for query in ['dentists in Denver', 'roofers in Reno', 'dentists in Denver']:
+        history.add_search(query)
+
+    popular = history.get_popular_searches()
+
+    assert [(row['query'], row['count']) for row in popular] == [('dentists in Denver', 2), ('roofers in Reno', 1)]
+
+
+def test_search_counts_backfilled_and_rebuilt_from_history(history):
+    history.add_search('dentists in Denver')
+    history.add_search('dentists in Denver')
+    with sqlite3.connect(history.db_path) as conn:
+        conn.execute('DELETE FROM search_counts')
+        conn.execute("UPDATE search_history SET timestamp = datetime('now', '-60 days') WHERE id = 1")
+
+    # An empty search_counts table is backfilled from search_history on startup
+    reopened = SearchHistoryManager(db_path=history.db_path)
+    assert [row['count'] for row in reopened.get_popular_searches()] == [2]
+
+    # Clearing old history recomputes the counts
+    assert reopened.clear_history(older_than_days=30) == 1
+    assert [row['count'] for row in reopened.get_popular_searches()] == [1]
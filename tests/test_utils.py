@@ -0,0 +1,182 @@
+"""
+Helpers in src/utils.py
+"""
+
+import io
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+from src import utils
+from src.utils import read_verified_leads, stream_zip, tail_lines, verified_email_mask, write_parquet_sidecar
+
+
+@pytest.fixture
+def result_csv(tmp_path):
+    """A job result file the way app.py writes it, with the gaps real scrapes have"""
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'leads.csv'
+    pd.DataFrame({
+        'Name': ['Acme Plumbing', None, 'Beta Dental', 'Gamma Roofing'],
+        'Address': ['1 Main St', '2 Oak Ave', None, '4 Elm St'],
+        'Phone': ['(512) 555-0100', None, '', '(512) 555-0103'],
+        'Website': [None, 'https://b.example', 'https://c.example', None],
+        'Email': ['ann@acme.com', 'bob@b.example', 'cy@c.example', ''],
+        'Email_Status': ['valid', 'valid', 'valid', 'valid'],
+        'LeadScore': [7, 5, 9, 3],
+        'LeadScoreReasoning': ['NA', 'Slow site', 'No SSL', 'NA'],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def test_parquet_copy_reads_back_like_the_csv(result_csv):
+    from_csv = read_verified_leads(result_csv)
+    assert write_parquet_sidecar(result_csv) == utils.parquet_sidecar_path(result_csv)
+    from_parquet = read_verified_leads(result_csv)
+
+    assert from_parquet == from_csv
+    assert from_csv[1]['Name'] == ''
+    assert from_csv[0]['Website'] == ''
+    assert from_csv[0]['LeadScoreReasoning'] == 'NA'
+
+
+def test_parquet_copy_matches_csv_with_columns_and_limit(result_csv):
+    columns = ['Name', 'Phone', 'LeadScore']
+    from_csv = read_verified_leads(result_csv, columns, limit=2)
+    write_parquet_sidecar(result_csv)
+
+    assert read_verified_leads(result_csv, columns, limit=2) == from_csv
+    assert len(from_csv) == 2
+
+
+def test_pandas_reader_matches_arrow_reader(result_csv, monkeypatch):
+    from_arrow = read_verified_leads(result_csv)
+    monkeypatch.setattr(utils, 'PYARROW_AVAILABLE', False)
+
+    assert read_verified_leads(result_csv) == from_arrow
+
+
+def test_older_parquet_copy_with_nan_text_is_blanked(result_csv):
+    from_csv = read_verified_leads(result_csv)
+    # Copies written straight from the DataFrame kept NaN for missing text
+    legacy = pd.read_csv(result_csv, keep_default_na=False, na_values=[''])
+    legacy.to_parquet(utils.parquet_sidecar_path(result_csv), index=False)
+
+    assert read_verified_leads(result_csv) == from_csv
+
+
+def test_stale_parquet_copy_is_ignored(result_csv):
+    write_parquet_sidecar(result_csv)
+    sidecar = utils.parquet_sidecar_path(result_csv)
+    os.utime(sidecar, ns=(0, 0))
+    pd.DataFrame({'Email': ['new@x.com'], 'Email_Status': ['valid']}).to_csv(result_csv, index=False)
+
+    assert read_verified_leads(result_csv) == [{'Email': 'new@x.com', 'Email_Status': 'valid'}]
+
+
+def write_lines(path, count, width=0):
+    path.write_text(''.join(f"line{i}{'x' * width}\n" for i in range(count)))
+    return str(path)
+
+
+def test_tail_lines_returns_last_lines(tmp_path):
+    path = write_lines(tmp_path / 'log.txt', 100)
+
+    assert tail_lines(path, count=3) == ['line97', 'line98', 'line99']
+
+
+def test_tail_lines_grows_window_until_enough_lines(tmp_path):
+    # Each line is ~100 bytes, so a 64-byte window has to double many times
+    path = write_lines(tmp_path / 'log.txt', 1000, width=94)
+
+    lines = tail_lines(path, count=200, window=64)
+
+    assert len(lines) == 200
+    assert lines[0].startswith('line800x')
+    assert lines[-1].startswith('line999x')
+
+
+def test_tail_lines_whole_file_when_shorter_than_count(tmp_path):
+    path = write_lines(tmp_path / 'log.txt', 5)
+
+    assert tail_lines(path, count=50, window=8) == [f'line{i}' for i in range(5)]
+
+
+def test_tail_lines_empty_file(tmp_path):
+    path = tmp_path / 'empty.txt'
+    path.write_text('')
+
+    assert tail_lines(str(path)) == []
+
+
+def test_verified_email_mask_with_only_some_verification_columns():
+    status_only = pd.DataFrame({'Email': ['a@x.com', 'b@x.com', '', 'NA'],
+                                'Email_Status': ['Valid', 'invalid', 'valid', 'valid']})
+    flag_only = pd.DataFrame({'Email': ['a@x.com', 'b@x.com'], 'Email_Verified': ['true', None]})
+
+    assert verified_email_mask(status_only).tolist() == [True, False, False, False]
+    assert verified_email_mask(flag_only).tolist() == [True, False]
+
+
+def test_verified_email_mask_without_verification_columns():
+    assert not verified_email_mask(pd.DataFrame({'Email': ['a@x.com']})).any()
+    assert not verified_email_mask(pd.DataFrame({'Name': ['Ann']})).any()
+
+
+def test_verified_email_mask_flag_values():
+    df = pd.DataFrame({
+        'Email': ['a@x.com', 'b@x.com', 'c@x.com', ' d@x.com ', 'e@x.com', None],
+        'Email_Status': [None, 'invalid', None, None, '', 'valid'],
+        'Email_Verified': ['YES', 'False', 'True', '1', '0', 'true'],
+    })
+
+    assert verified_email_mask(df).tolist() == [True, False, True, True, False, False]
+
+
+def zip_entries(*paths):
+    return [(str(path), path.name, os.stat(path)) for path in paths]
+
+
+def test_stream_zip_round_trips_without_empty_chunks(tmp_path):
+    leads = tmp_path / 'leads.csv'
+    leads.write_text('name,email\n' + 'Acme,ann@acme.com\n' * 20000)
+    empty = tmp_path / 'empty.csv'
+    empty.write_text('')
+
+    chunks = list(stream_zip(zip_entries(leads, empty), block_size=4096))
+
+    assert len(chunks) > 1
+    assert all(chunks)
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as zf:
+        assert zf.namelist() == ['leads.csv', 'empty.csv']
+        assert zf.read('leads.csv') == leads.read_bytes()
+        assert zf.read('empty.csv') == b''
+
+
+def test_stream_zip_with_no_entries_is_an_empty_archive():
+    with zipfile.ZipFile(io.BytesIO(b''.join(stream_zip([])))) as zf:
+        assert zf.namelist() == []
+
+
+def test_stream_zip_stores_precompressed_files(tmp_path):
+    leads = tmp_path / 'leads.csv'
+    leads.write_text('name,email\n' * 1000)
+    parquet = tmp_path / 'leads.parquet'
+    parquet.write_bytes(os.urandom(4096))
+
+    with zipfile.ZipFile(io.BytesIO(b''.join(stream_zip(zip_entries(leads, parquet))))) as zf:
+        assert zf.getinfo('leads.csv').compress_type == zipfile.ZIP_DEFLATED
+        assert zf.getinfo('leads.parquet').compress_type == zipfile.ZIP_STORED
+        assert zf.read('leads.parquet') == parquet.read_bytes()
+
+
+def test_stream_zip_uses_requested_level(tmp_path):
+    leads = tmp_path / 'leads.csv'
+    leads.write_text(''.join(f'Company {i},person{i}@example.com,{i * 7919 % 1000}\n' for i in range(20000)))
+
+    fast = b''.join(stream_zip(zip_entries(leads), compresslevel=1))
+    best = b''.join(stream_zip(zip_entries(leads), compresslevel=9))
+
+    assert len(best) < len(fast)